@@ -0,0 +1,140 @@
+import re
+import pandas as pd
+
+# Outcome slots stored per matchup cell: wins, draws, losses, xG diff sum, xG sample count
+WIN, DRAW, LOSS, XG_SUM, XG_N = range(5)
+
+
+def clean_formation(value):
+    """Normalise a formation label the same way the Formation page does"""
+    return str(value).strip().encode('ascii', 'ignore').decode('ascii')
+
+
+def parse_goals(value):
+    """Leading goal count of a score cell such as '2', '2.0' or '1 (4)'"""
+    match = re.match(r'^(\d+)', str(value).strip())
+    return int(match.group(1)) if match else None
+
+
+def parse_xg(value):
+    try:
+        xg = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if pd.isna(xg) else xg
+
+
+class MatchupTable:
+    """Smoothed formation-vs-formation results, updated one match at a time.
+
+    Every match is stored from both sides, so ``lookup(a, b)`` answers how
+    formation ``a`` fares against ``b``. Rates are shrunk towards the
+    dataset-wide outcome rates with ``prior_strength`` pseudo-matches, and
+    the mean xG difference is shrunk towards zero the same way, so thin
+    matchups do not report 100% win rates off a single game.
+    """
+
+    def __init__(self, prior_strength=5.0):
+        self.prior_strength = prior_strength
+        self._cells = {}
+        self._opponents = {}
+        self._totals = [0, 0, 0]
+
+    def __len__(self):
+        return sum(self._totals) // 2
+
+    def formations(self):
+        return sorted(self._opponents)
+
+    def _cell(self, formation, opponent):
+        key = (formation, opponent)
+        if key not in self._cells:
+            self._cells[key] = [0, 0, 0, 0.0, 0]
+            self._opponents.setdefault(opponent, set()).add(formation)
+            self._opponents.setdefault(formation, set())
+        return self._cells[key]
+
+    def _record(self, formation, opponent, outcome, xg_diff):
+        cell = self._cell(formation, opponent)
+        cell[outcome] += 1
+        self._totals[outcome] += 1
+        if xg_diff is not None:
+            cell[XG_SUM] += xg_diff
+            cell[XG_N] += 1
+
+    def update(self, row):
+        """Add one row of merged2_output.csv; returns False if it was unusable"""
+        winner = clean_formation(row.get('Winning Team Formation', ''))
+        loser = clean_formation(row.get('Losing Team Formation', ''))
+        winner_goals = parse_goals(row.get('Winning Team Goals'))
+        loser_goals = parse_goals(row.get('Losing Team Goals'))
+        if winner in ('', 'nan') or loser in ('', 'nan') or winner_goals is None or loser_goals is None:
+            return False
+
+        winner_xg = parse_xg(row.get('Winning Team xG'))
+        loser_xg = parse_xg(row.get('Losing Team xG'))
+        xg_diff = winner_xg - loser_xg if winner_xg is not None and loser_xg is not None else None
+
+        if winner_goals == loser_goals:
+            outcome, reverse = DRAW, DRAW
+        elif winner_goals > loser_goals:
+            outcome, reverse = WIN, LOSS
+        else:
+            outcome, reverse = LOSS, WIN
+
+        self._record(winner, loser, outcome, xg_diff)
+        self._record(loser, winner, reverse, -xg_diff if xg_diff is not None else None)
+        return True
+
+    def add_matches(self, df):
+        """Add every row of a results frame and return how many were used"""
+        added = 0
+        for row in df.to_dict('records'):
+            added += self.update(row)
+        return added
+
+    def prior(self):
+        total = sum(self._totals)
+        if total == 0:
+            return 1 / 3, 1 / 3, 1 / 3
+        return tuple(count / total for count in self._totals)
+
+    def lookup(self, formation, opponent):
+        """Smoothed record of ``formation`` against ``opponent``"""
+        cell = self._cells.get((clean_formation(formation), clean_formation(opponent)), [0, 0, 0, 0.0, 0])
+        matches = cell[WIN] + cell[DRAW] + cell[LOSS]
+        weight = self.prior_strength
+        prior_win, prior_draw, prior_loss = self.prior()
+        win_rate = (cell[WIN] + weight * prior_win) / (matches + weight)
+        draw_rate = (cell[DRAW] + weight * prior_draw) / (matches + weight)
+        loss_rate = (cell[LOSS] + weight * prior_loss) / (matches + weight)
+        return {
+            'Formation': clean_formation(formation),
+            'Opponent': clean_formation(opponent),
+            'Matches': matches,
+            'Win Rate': win_rate,
+            'Draw Rate': draw_rate,
+            'Loss Rate': loss_rate,
+            'Expected Points': 3 * win_rate + draw_rate,
+            'Mean xG Diff': cell[XG_SUM] / (cell[XG_N] + weight),
+            'xG Matches': cell[XG_N],
+        }
+
+    def counters(self, opponent, min_matches=1):
+        """Formations that have faced ``opponent``, best expected points first"""
+        opponent = clean_formation(opponent)
+        rows = [self.lookup(formation, opponent) for formation in self._opponents.get(opponent, ())]
+        rows = [row for row in rows if row['Matches'] >= min_matches]
+        if not rows:
+            return pd.DataFrame(columns=list(self.lookup(opponent, opponent)))
+        return pd.DataFrame(rows).sort_values(['Expected Points', 'Matches'], ascending=False).reset_index(drop=True)
+
+    def to_frame(self):
+        """Full matrix, one row per (formation, opponent) pair that has been played"""
+        return pd.DataFrame([self.lookup(formation, opponent) for formation, opponent in self._cells])
+
+
+def build_matchup_table(df, prior_strength=5.0):
+    table = MatchupTable(prior_strength=prior_strength)
+    table.add_matches(df)
+    return table
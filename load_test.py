@@ -0,0 +1,335 @@
+"""Concurrent-session load test for the Streamlit app.
+
+Simulates N analysts clicking through ``main.py`` and ``pages/1``-``5`` at the
+same time with ``streamlit.testing.v1.AppTest``. The StatsBomb loaders are
+replaced with deterministic local fixtures, so no network access is needed and
+every run replays the same data. Each session keeps its own AppTest (and
+therefore its own session state) for the whole run, while the st.cache_data
+caches are shared across sessions as they are on a real server.
+
+    python load_test.py --sessions 8 --iterations 20
+    python load_test.py --sessions 16 --flows 1 2 --json results.json
+
+Reports p50/p95/p99 latency per interaction, reruns per second and the resident
+memory of this process (which plays the server) sampled over the run.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import numpy as np
+import pandas as pd
+from mplsoccer import Sbopen
+from statsbombpy import sb
+from streamlit.runtime import Runtime
+from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+from streamlit.runtime.media_file_manager import MediaFileManager
+from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+from streamlit.testing.v1 import AppTest
+from unittest.mock import MagicMock
+
+# Session threads have no ScriptRunContext and would warn on every st call. Streamlit
+# resets its logger levels whenever it parses config, so filter instead of raising the level
+logging.getLogger('streamlit.runtime.scriptrunner_utils.script_run_context').addFilter(
+    lambda record: 'missing ScriptRunContext' not in record.getMessage())
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEAMS = ['Barcelona', 'Real Madrid', 'Valencia', 'Sevilla']
+PLAYERS = {team: [f"{team} Player {i}" for i in range(1, 12)] for team in TEAMS}
+
+
+# Fixtures standing in for the StatsBomb open data
+def fixture_competitions():
+    return pd.DataFrame([{
+        'competition_id': 11, 'season_id': 1, 'country_name': 'Spain',
+        'competition_name': 'La Liga', 'season_name': '2017/2018', 'competition_gender': 'male'
+    }])
+
+
+def fixture_matches():
+    rows = []
+    for i, (home, away) in enumerate(zip(TEAMS, TEAMS[1:] + TEAMS[:1])):
+        rows.append({'match_id': 1000 + i, 'home_team': home, 'away_team': away,
+                     'match_date': f"2018-01-{i + 1:02d}", 'stadium': f"{home} Stadium"})
+    return pd.DataFrame(rows)
+
+
+def fixture_events(match_id):
+    """Sbopen-style flat events for one fixture match; same match id, same events"""
+    match = fixture_matches().set_index('match_id').loc[match_id]
+    rng = np.random.default_rng(match_id)
+    n = 3000
+    teams = rng.choice([match['home_team'], match['away_team']], n)
+    players = np.array([rng.choice(PLAYERS[team]) for team in teams])
+    types = rng.choice(['Pass', 'Ball Receipt*', 'Carry', 'Pressure', 'Shot'], n, p=[0.35, 0.3, 0.25, 0.08, 0.02])
+    seconds = np.sort(rng.uniform(0, 90 * 60, n)).astype(int)
+    df = pd.DataFrame({
+        'index': np.arange(1, n + 1),
+        'period': np.where(seconds < 45 * 60, 1, 2),
+        'minute': seconds // 60,
+        'second': seconds % 60,
+        'type_name': types,
+        'team_name': teams,
+        'player_name': players,
+        'x': rng.uniform(0, 120, n).round(1),
+        'y': rng.uniform(0, 80, n).round(1),
+        'end_x': rng.uniform(0, 120, n).round(1),
+        'end_y': rng.uniform(0, 80, n).round(1),
+        'outcome_name': np.where(rng.random(n) < 0.2, 'Incomplete', None),
+        'sub_type_name': np.where(types == 'Shot', 'Open Play', None),
+        'shot_statsbomb_xg': np.where(types == 'Shot', rng.uniform(0.01, 0.6, n).round(3), np.nan),
+    })
+    shots = df['type_name'] == 'Shot'
+    df.loc[shots, 'outcome_name'] = rng.choice(['Goal', 'Saved', 'Off T'], shots.sum(), p=[0.15, 0.45, 0.4])
+    return df
+
+
+def fixture_sb_events(match_id):
+    """The same events in statsbombpy's nested layout"""
+    df = fixture_events(match_id)
+    return pd.DataFrame({
+        'index': df['index'],
+        'period': df['period'],
+        'minute': df['minute'],
+        'second': df['second'],
+        'type': df['type_name'],
+        'team': df['team_name'],
+        'player': df['player_name'],
+        'location': [[x, y] for x, y in zip(df['x'], df['y'])],
+        'shot_outcome': df['outcome_name'].where(df['type_name'] == 'Shot'),
+        'pass_outcome': df['outcome_name'].where(df['type_name'] == 'Pass'),
+        'shot_type': df['sub_type_name'],
+        'shot_statsbomb_xg': df['shot_statsbomb_xg'],
+    })
+
+
+def install_fixtures():
+    """Patch the StatsBomb loaders the pages import with the local fixtures"""
+    sb.competitions = lambda *args, **kwargs: fixture_competitions()
+    sb.matches = lambda competition_id, season_id, *args, **kwargs: fixture_matches()
+    sb.events = lambda match_id, *args, **kwargs: fixture_sb_events(match_id)
+    Sbopen.competition = lambda self: fixture_competitions()
+    Sbopen.match = lambda self, competition_id, season_id: fixture_matches().rename(
+        columns={'home_team': 'home_team_name', 'away_team': 'away_team_name'})
+    Sbopen.event = lambda self, match_id: (fixture_events(match_id), None, None, None)
+
+
+def install_shared_runtime():
+    """One runtime for every session, like a single server process.
+
+    AppTest swaps a mock runtime into a global slot for each script run and
+    clears it afterwards, which breaks sessions running on other threads. It
+    also compiles the script on every run, and CPython's parser is not safe to
+    call from several threads at once, so compilation is serialized here the
+    way a real server compiles each page once.
+    """
+    runtime = MagicMock(spec=Runtime)
+    runtime.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    runtime.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: runtime)
+    Runtime.exists = classmethod(lambda cls: True)
+
+    compile_lock = threading.Lock()
+    get_bytecode = ScriptCache.get_bytecode
+
+    def locked_get_bytecode(self, script_path):
+        with compile_lock:
+            return get_bytecode(self, script_path)
+
+    ScriptCache.get_bytecode = locked_get_bytecode
+
+
+# Flows: each is a list of (interaction name, action on the AppTest)
+def _click(label):
+    return lambda at: next(b for b in at.button if b.label == label).click().run()
+
+
+def _select(key, pick):
+    def action(at):
+        box = at.selectbox(key=key)
+        return box.select(pick(box.options)).run()
+    return action
+
+
+def flow_main():
+    return [('main:load', lambda at: at.run())]
+
+
+def flow_shot_analysis():
+    return [
+        ('shots:load', lambda at: at.run()),
+        ('shots:analyze', lambda at: next(b for b in at.button if b.label == 'Analyze').click().run()),
+    ]
+
+
+def flow_passing():
+    return [
+        ('passing:load', lambda at: at.run()),
+        ('passing:select_player', _select('player_select', lambda options: options[0])),
+        ('passing:show', _click('Show Pass Analysis')),
+    ]
+
+
+def flow_top_scorer():
+    return [
+        ('top_scorer:load', lambda at: at.run()),
+        ('top_scorer:analyze', _click('Analyze Data')),
+        ('top_scorer:select_player', lambda at: at.selectbox[-1].select(at.selectbox[-1].options[-1]).run()),
+    ]
+
+
+def flow_formation():
+    return [
+        ('formation:load', lambda at: at.run()),
+        ('formation:counter', _click('🎯 Get Counter Formation')),
+    ]
+
+
+def flow_tactical():
+    return [
+        ('tactical:load', lambda at: at.run()),
+        ('tactical:predict', _click('Predict Tactic')),
+    ]
+
+
+FLOWS = {
+    'main': ('main.py', flow_main),
+    '1': ('pages/1_Match_Shot_Analysis.py', flow_shot_analysis),
+    '2': ('pages/2_Passing_Analysis.py', flow_passing),
+    '3': ('pages/3_Top_Scorer_Analysis.py', flow_top_scorer),
+    '4': ('pages/4_Formation_Analysis.py', flow_formation),
+    '5': ('pages/5_Tactical_Pattern.py', flow_tactical),
+}
+
+
+def rss_mb():
+    """Current resident memory of this process, falling back to the peak off Linux"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1e6
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+class MemorySampler(threading.Thread):
+    def __init__(self, interval):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        start = time.perf_counter()
+        while not self._stop_event.is_set():
+            self.samples.append((round(time.perf_counter() - start, 2), round(rss_mb(), 1)))
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+        self.samples.append((self.samples[-1][0] if self.samples else 0.0, round(rss_mb(), 1)))
+
+
+def run_session(session_id, flows, iterations, timeout, latencies, errors, lock):
+    """One simulated analyst: a fresh AppTest per page, reused across iterations"""
+    apps = {name: AppTest.from_file(os.path.join(BASE_DIR, FLOWS[name][0]), default_timeout=timeout)
+            for name in flows}
+    for iteration in range(iterations):
+        for name in flows:
+            at = apps[name]
+            for step, action in FLOWS[name][1]():
+                error = None
+                start = time.perf_counter()
+                try:
+                    action(at)
+                    if at.exception:
+                        error = at.exception[0].message
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                elapsed = time.perf_counter() - start
+                with lock:
+                    latencies[step].append(elapsed)
+                    if error:
+                        errors[step].append(f"session {session_id}, iteration {iteration}: {error}")
+                if error:
+                    break
+
+
+def summarize(latencies, errors, wall_time, samples):
+    rows = []
+    for step, values in latencies.items():
+        ms = np.array(values) * 1000
+        rows.append({
+            'Interaction': step,
+            'Runs': len(values),
+            'Errors': len(errors.get(step, [])),
+            'p50 ms': round(np.percentile(ms, 50), 1),
+            'p95 ms': round(np.percentile(ms, 95), 1),
+            'p99 ms': round(np.percentile(ms, 99), 1),
+        })
+    total_runs = sum(len(values) for values in latencies.values())
+    return {
+        'interactions': rows,
+        'reruns_per_second': round(total_runs / wall_time, 2) if wall_time > 0 else 0.0,
+        'wall_time_s': round(wall_time, 2),
+        'rss_start_mb': samples[0][1],
+        'rss_end_mb': samples[-1][1],
+        'rss_growth_mb': round(samples[-1][1] - samples[0][1], 1),
+        'rss_samples': samples,
+        'errors': {step: messages[:5] for step, messages in errors.items() if messages},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the Streamlit pages with concurrent simulated sessions")
+    parser.add_argument('--sessions', type=int, default=4)
+    parser.add_argument('--iterations', type=int, default=5, help="Times each session repeats its flows")
+    parser.add_argument('--flows', nargs='+', choices=list(FLOWS), default=list(FLOWS))
+    parser.add_argument('--timeout', type=float, default=60.0, help="Seconds allowed per script run")
+    parser.add_argument('--sample-interval', type=float, default=1.0, help="Seconds between memory samples")
+    parser.add_argument('--json', help="Also write the full results to this file")
+    args = parser.parse_args()
+
+    # Pages open data files relative to the working directory
+    os.chdir(BASE_DIR)
+    install_fixtures()
+    install_shared_runtime()
+
+    latencies = defaultdict(list)
+    errors = defaultdict(list)
+    lock = threading.Lock()
+    sampler = MemorySampler(args.sample_interval)
+    sampler.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.sessions) as executor:
+        for future in [executor.submit(run_session, i, args.flows, args.iterations, args.timeout, latencies, errors, lock)
+                       for i in range(args.sessions)]:
+            future.result()
+    wall_time = time.perf_counter() - start
+    sampler.stop()
+
+    results = summarize(latencies, errors, wall_time, sampler.samples)
+    print(pd.DataFrame(results['interactions']).to_string(index=False))
+    print(f"\nSessions: {args.sessions}  Wall time: {results['wall_time_s']}s  "
+          f"Reruns/s: {results['reruns_per_second']}")
+    print(f"RSS: {results['rss_start_mb']} MB -> {results['rss_end_mb']} MB "
+          f"(growth {results['rss_growth_mb']} MB)")
+    for step, messages in results['errors'].items():
+        print(f"{step} errors: {messages[0]}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -58,6 +58,7 @@ st.markdown("<div class='dashboard-title'>⚽ Smart Tiki-Taka: Football Intellig
 # Create tile layout
 cols1 = st.columns(3)
 cols2 = st.columns(3)
+cols3 = st.columns(3)
 
 # First row
 with cols1[0]:
@@ -77,3 +78,11 @@ with cols2[0]:
 with cols2[1]:
     if st.button("Tactical Pattern", use_container_width=True):
         st.switch_page("pages/5_Tactical_Pattern.py")
+with cols2[2]:
+    if st.button("SQL Query Explorer", use_container_width=True):
+        st.switch_page("pages/6_Query_Explorer.py")
+
+# Third row
+with cols3[0]:
+    if st.button("Player Comparison", use_container_width=True):
+        st.switch_page("pages/7_Player_Comparison.py")
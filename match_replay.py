@@ -0,0 +1,91 @@
+"""Minute-by-minute match replay with incremental statistics.
+
+``replay_ticks`` feeds a match's events in timestamp order, one batch per
+match minute, standing in for a live feed. ``MatchReplay`` folds each batch
+into running shot, goal, xG and pass totals and hands back only the new shots
+and passes, so the pages can draw them onto an existing figure instead of
+refiltering the whole match every tick. Works with both the statsbombpy and
+the mplsoccer Sbopen event layouts.
+"""
+import pandas as pd
+
+from match_visuals import event_columns
+
+
+def replay_ticks(events, minutes_per_tick=1):
+    """Yield ``(period, minute, batch)`` in match order"""
+    order = [col for col in ('period', 'minute', 'second', 'index') if col in events.columns]
+    df = events.sort_values(order, kind='stable')
+    period = df['period'] if 'period' in df.columns else pd.Series(1, index=df.index)
+    tick = df['minute'] // minutes_per_tick
+    for (period_value, tick_value), batch in df.groupby([period, tick], sort=True):
+        yield int(period_value), int(tick_value * minutes_per_tick), batch
+
+
+class MatchReplay:
+    """Running totals for a match fed one batch of events at a time.
+
+    ``update`` only looks at the new batch, so a tick costs O(new events)
+    however far into the match the replay is.
+    """
+
+    def __init__(self, home_team, away_team):
+        self.teams = [home_team, away_team]
+        self.shots = dict.fromkeys(self.teams, 0)
+        self.goals = dict.fromkeys(self.teams, 0)
+        self.xg = dict.fromkeys(self.teams, 0.0)
+        self.team_passes = {team: [0, 0] for team in self.teams}
+        self.player_passes = {}
+        self.clock = (1, 0)
+        self._cols = None
+
+    def _columns(self, batch):
+        cols = event_columns(batch)
+        cols['pass_outcome'] = next((col for col in ('pass_outcome', 'outcome_name') if col in batch.columns), None)
+        cols['xg'] = 'shot_statsbomb_xg' if 'shot_statsbomb_xg' in batch.columns else None
+        return cols
+
+    def update(self, batch):
+        """Fold new events into the totals and return ``(new_shots, new_passes)``"""
+        if batch.empty:
+            return batch, batch
+        if self._cols is None:
+            self._cols = self._columns(batch)
+        cols = self._cols
+
+        if 'period' in batch.columns and 'minute' in batch.columns:
+            self.clock = (int(batch['period'].iloc[-1]), int(batch['minute'].iloc[-1]))
+
+        shots = batch[batch[cols['type']] == 'Shot']
+        if not shots.empty:
+            xg = shots[cols['xg']].fillna(0.0) if cols['xg'] else pd.Series(0.0, index=shots.index)
+            per_team = pd.DataFrame({
+                'team': shots[cols['team']],
+                'shots': 1,
+                'goals': (shots[cols['outcome']] == 'Goal').astype(int),
+                'xg': xg,
+            }).groupby('team').sum()
+            for team, row in per_team.iterrows():
+                self.shots[team] = self.shots.get(team, 0) + int(row['shots'])
+                self.goals[team] = self.goals.get(team, 0) + int(row['goals'])
+                self.xg[team] = self.xg.get(team, 0.0) + float(row['xg'])
+
+        passes = batch[batch[cols['type']] == 'Pass']
+        if not passes.empty:
+            if cols['pass_outcome']:
+                successful = passes[cols['pass_outcome']].isna().astype(int)
+            else:
+                successful = pd.Series(1, index=passes.index)
+            for totals, key in ((self.team_passes, cols['team']), (self.player_passes, cols['player'])):
+                counts = successful.groupby(passes[key]).agg(['size', 'sum'])
+                for name, (total, success) in counts.iterrows():
+                    running = totals.setdefault(name, [0, 0])
+                    running[0] += int(total)
+                    running[1] += int(success)
+
+        return shots, passes
+
+    def pass_accuracy(self, name):
+        """Running pass accuracy (%) for a team or player name"""
+        total, successful = self.team_passes.get(name) or self.player_passes.get(name) or (0, 0)
+        return successful / total * 100 if total > 0 else 0.0
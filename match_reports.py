@@ -0,0 +1,183 @@
+"""Headless batch generator for per-match PNG/PDF reports.
+
+Renders the visuals of the Match Shot, Passing and Top Scorer pages plus a
+summary table for every match of a competition/season (or a list of match
+ids) on a process pool, e.g.
+
+    python match_reports.py --competition-id 11 --season-id 1 --out reports
+    python match_reports.py --match-ids 9880 9889 --format png
+
+Each match gets its own folder under ``--out``. A match is skipped when its
+manifest shows it was already rendered with the same report version and
+formats; pass ``--force`` to render it again.
+"""
+import argparse
+import json
+import os
+import re
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_pdf import PdfPages
+import pandas as pd
+from mplsoccer import Sbopen
+
+import shared_store
+from match_visuals import shot_map, pass_map, player_shot_map
+
+# Bump whenever the report layout changes so existing reports are re-rendered
+REPORT_VERSION = 1
+MANIFEST = 'manifest.json'
+
+
+def load_match_list(competition_id, season_id):
+    matches = Sbopen().match(competition_id=competition_id, season_id=season_id)
+    return matches[['match_id', 'home_team_name', 'away_team_name', 'match_date']]
+
+
+def slugify(text):
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(text)).strip('_')
+
+
+def match_summary(events, teams):
+    """Shots, goals, xG, passes and pass accuracy per team"""
+    rows = []
+    for team in teams:
+        team_events = events[events['team_name'] == team]
+        shots = team_events[team_events['type_name'] == 'Shot']
+        passes = team_events[team_events['type_name'] == 'Pass']
+        successful = passes['outcome_name'].isna().sum()
+        rows.append({
+            'Team': team,
+            'Shots': len(shots),
+            'Goals': int((shots['outcome_name'] == 'Goal').sum()),
+            'xG': round(shots['shot_statsbomb_xg'].sum(), 2),
+            'Passes': len(passes),
+            'Pass Accuracy': round(successful / len(passes) * 100, 1) if len(passes) > 0 else 0.0
+        })
+    return pd.DataFrame(rows)
+
+
+def summary_figure(summary, title):
+    fig, ax = plt.subplots(figsize=(12, 3))
+    ax.axis('off')
+    table = ax.table(cellText=summary.values, colLabels=summary.columns, loc='center', cellLoc='center')
+    table.scale(1, 2)
+    ax.set_title(title, fontsize=16)
+    return fig
+
+
+def match_figures(events, home_team, away_team, summary):
+    """Yield (file stem, figure) for every visual of one match.
+
+    Figures are built one at a time so the caller can save and close each
+    before the next is drawn; a match can have 30+ pass maps.
+    """
+    teams = [home_team, away_team]
+    yield 'summary', summary_figure(summary, f"{home_team} vs {away_team}")
+
+    fig = shot_map(events, home_team, away_team)
+    if fig is not None:
+        yield 'shot_map', fig
+
+    # Non-penalty shots, as on the Top Scorer page
+    shots = events[(events['type_name'] == 'Shot') & (events['sub_type_name'] != 'Penalty') & events['x'].notna()]
+    for team in teams:
+        team_shots = shots[shots['team_name'] == team]
+        if team_shots.empty:
+            continue
+        top_player = team_shots.groupby('player_name')['shot_statsbomb_xg'].sum().idxmax()
+        player_shots = team_shots[team_shots['player_name'] == top_player]
+        player_goals = player_shots[player_shots['outcome_name'] == 'Goal']
+        yield f"top_scorer_{slugify(team)}", player_shot_map(player_shots, player_goals, top_player)
+
+    passes = events[events['type_name'] == 'Pass']
+    for team in teams:
+        team_passes = passes[passes['team_name'] == team]
+        for player, df_pass in team_passes.groupby('player_name'):
+            df_pass = df_pass[['x', 'y', 'end_x', 'end_y', 'outcome_name']]
+            yield f"passes_{slugify(team)}_{slugify(player)}", pass_map(df_pass, player)
+
+
+def is_up_to_date(match_dir, formats):
+    try:
+        with open(os.path.join(match_dir, MANIFEST)) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (manifest.get('version') == REPORT_VERSION
+            and set(formats) <= set(manifest.get('formats', []))
+            and all(os.path.exists(os.path.join(match_dir, name)) for name in manifest.get('files', [])))
+
+
+def render_match(match, out_dir, formats, force=False):
+    """Render one match report; runs inside a worker process"""
+    match_id = int(match['match_id'])
+    match_dir = os.path.join(out_dir, str(match_id))
+    if not force and is_up_to_date(match_dir, formats):
+        return match_id, 'skipped'
+
+    events = shared_store.sbopen_events(match_id)
+    if events.empty:
+        return match_id, 'no events'
+
+    home_team = match.get('home_team_name')
+    away_team = match.get('away_team_name')
+    if not home_team or not away_team:
+        home_team, away_team = events['team_name'].dropna().unique()[:2]
+
+    os.makedirs(match_dir, exist_ok=True)
+    summary = match_summary(events, [home_team, away_team])
+    files = ['summary.csv']
+    summary.to_csv(os.path.join(match_dir, 'summary.csv'), index=False)
+
+    pdf = PdfPages(os.path.join(match_dir, f"{match_id}.pdf")) if 'pdf' in formats else None
+    try:
+        for stem, fig in match_figures(events, home_team, away_team, summary):
+            if 'png' in formats:
+                fig.savefig(os.path.join(match_dir, f"{stem}.png"), dpi=100, bbox_inches='tight')
+                files.append(f"{stem}.png")
+            if pdf is not None:
+                pdf.savefig(fig, bbox_inches='tight')
+            plt.close(fig)
+    finally:
+        if pdf is not None:
+            pdf.close()
+            files.append(f"{match_id}.pdf")
+
+    with open(os.path.join(match_dir, MANIFEST), 'w') as f:
+        json.dump({'version': REPORT_VERSION, 'formats': sorted(formats), 'files': files,
+                   'home_team': home_team, 'away_team': away_team}, f, indent=2)
+    return match_id, 'rendered'
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render match reports for a matchweek, season or list of matches")
+    parser.add_argument('--competition-id', type=int)
+    parser.add_argument('--season-id', type=int)
+    parser.add_argument('--match-ids', type=int, nargs='+')
+    parser.add_argument('--out', default='reports')
+    parser.add_argument('--format', nargs='+', choices=['png', 'pdf'], default=['png', 'pdf'])
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--force', action='store_true', help="Re-render reports that are already up to date")
+    args = parser.parse_args()
+
+    if args.competition_id is not None and args.season_id is not None:
+        matches = load_match_list(args.competition_id, args.season_id)
+        if args.match_ids:
+            matches = matches[matches['match_id'].isin(args.match_ids)]
+        matches = matches.to_dict('records')
+    elif args.match_ids:
+        matches = [{'match_id': match_id} for match_id in args.match_ids]
+    else:
+        parser.error("pass --competition-id and --season-id, or --match-ids")
+
+    results = shared_store.map_matches(render_match, matches, workers=args.workers,
+                                       args=(args.out, args.format, args.force), label=lambda match: match['match_id'])
+    for match_id, status in results:
+        print(f"{match_id}: {status}")
+
+
+if __name__ == "__main__":
+    main()
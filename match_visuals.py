@@ -0,0 +1,149 @@
+"""Pitch visuals shared by the analysis pages and the batch report generator.
+
+Nothing in here touches Streamlit, so the functions can run in headless
+worker processes; the pages wrap them with their own warnings and errors.
+"""
+import ast
+import pandas as pd
+from mplsoccer import Pitch, VerticalPitch, Radar
+
+
+def event_columns(events_df):
+    """Column names for either statsbombpy or mplsoccer Sbopen event frames"""
+    return {
+        'team': 'team' if 'team' in events_df.columns else 'team_name',
+        'type': 'type' if 'type' in events_df.columns else 'type_name',
+        'outcome': 'shot_outcome' if 'shot_outcome' in events_df.columns else 'outcome_name',
+        'player': 'player' if 'player' in events_df.columns else 'player_name',
+        'location': 'location' if 'location' in events_df.columns else None,
+        'x': 'x' if 'x' in events_df.columns else None,
+        'y': 'y' if 'y' in events_df.columns else None
+    }
+
+
+def _shot_xy(shot, cols):
+    if cols['x'] and cols['y'] and pd.notna(shot[cols['x']]) and pd.notna(shot[cols['y']]):
+        return shot[cols['x']], shot[cols['y']]
+    loc = shot[cols['location']]
+    return ast.literal_eval(loc) if isinstance(loc, str) else loc
+
+
+# Match shot map, team1 attacking right in red and team2 attacking left in blue
+def shot_map(events_df, team1, team2):
+    cols = event_columns(events_df)
+    shots = events_df[events_df[cols['type']] == 'Shot']
+    if shots.empty:
+        return None
+
+    pitch, fig, ax = empty_shot_map(team1, team2)
+    draw_shots(pitch, ax, shots, team1, team2, cols)
+    return fig
+
+
+def empty_shot_map(team1, team2):
+    pitch = Pitch(line_color='black', pitch_type='statsbomb')
+    fig, ax = pitch.draw(figsize=(12, 8))
+    ax.set_title(f"{team1} (Red) vs {team2} (Blue) - Shot Map", fontsize=16)
+    return pitch, fig, ax
+
+
+def draw_shots(pitch, ax, shots, team1, team2, cols):
+    """Add shots to an existing shot map; used whole by shot_map and per tick by replays"""
+    for team, color, flip in ((team1, 'red', False), (team2, 'blue', True)):
+        for _, shot in shots[shots[cols['team']] == team].iterrows():
+            try:
+                x, y = _shot_xy(shot, cols)
+                if flip:
+                    x, y = 120 - x, 80 - y
+                if shot[cols['outcome']] == 'Goal':
+                    pitch.scatter(x, y, ax=ax, s=500, color=color, alpha=1)
+                    pitch.annotate(str(shot[cols['player']]), (x+1, y-2), ax=ax, fontsize=12)
+                else:
+                    pitch.scatter(x, y, ax=ax, s=300, color=color, alpha=0.3)
+            except Exception:
+                continue
+
+
+# Pass map for one player, expects Sbopen columns x, y, end_x, end_y, outcome_name
+def pass_map(df_pass, player_name):
+    pitch, fig, ax = empty_pass_map(player_name)
+    draw_passes(pitch, ax, df_pass)
+
+    successful = df_pass['outcome_name'].isna().sum()
+    failed = len(df_pass) - successful
+    accuracy = successful / len(df_pass) * 100 if len(df_pass) > 0 else 0
+
+    stats_text = f"Successful: {successful}\nFailed: {failed}\nAccuracy: {accuracy:.1f}%"
+    ax.text(110, 80, stats_text, fontsize=12, color='black',
+            ha='right', bbox=dict(facecolor='white', alpha=0.8, edgecolor='black'))
+
+    return fig
+
+
+def empty_pass_map(player_name):
+    pitch = Pitch(line_color='black', pitch_type='statsbomb')
+    fig, ax = pitch.draw(figsize=(12, 8))
+    ax.set_title(f"Pass Analysis for {player_name}\nGreen = Accurate   |   Red = Inaccurate", fontsize=14)
+    return pitch, fig, ax
+
+
+def draw_passes(pitch, ax, df_pass):
+    for _, row in df_pass.iterrows():
+        color = 'green' if pd.isna(row['outcome_name']) else 'red'
+        pitch.arrows(row['x'], row['y'], row['end_x'], row['end_y'],
+                     color=color, ax=ax, width=2, headwidth=4, headlength=4)
+        pitch.scatter(row['x'], row['y'], alpha=0.5, s=200, color=color, ax=ax)
+
+
+# Half-pitch shot map for one player, marker size scaled by xG
+def player_shot_map(player_shots, player_goals, player_name, xg_col='shot_statsbomb_xg'):
+    pitch = VerticalPitch(pitch_type='statsbomb', half=True)
+    fig, ax = pitch.draw(figsize=(12, 8))
+
+    if not player_shots.empty:
+        pitch.scatter(
+            player_shots['x'], player_shots['y'],
+            s=player_shots[xg_col] * 500 + 100,
+            c='red', alpha=0.6, label='Shots', ax=ax
+        )
+
+    if not player_goals.empty:
+        pitch.scatter(
+            player_goals['x'], player_goals['y'],
+            s=player_goals[xg_col] * 500 + 100,
+            c='white', edgecolors='blue',
+            marker='football', label='Goals', ax=ax
+        )
+
+    ax.legend(loc='center')
+    ax.set_title(f"{player_name} Shot Map")
+    return fig
+
+
+# Single hypothetical shot on a half pitch, labelled with its xG
+def what_if_map(x, y, xg):
+    pitch = VerticalPitch(pitch_type='statsbomb', half=True)
+    fig, ax = pitch.draw(figsize=(8, 6))
+    pitch.scatter(x, y, s=xg * 500 + 100, c='red', alpha=0.8, ax=ax)
+    pitch.annotate(f"xG {xg:.2f}", (x + 2, y), ax=ax, fontsize=14, ha='center')
+    ax.set_title("What-if Shot")
+    return fig
+
+
+# Percentile radar for one player, or two players overlaid for comparison
+def percentile_radar(params, values, player_name, compare_values=None, compare_name=None):
+    radar = Radar(params, [0] * len(params), [100] * len(params), num_rings=4, ring_width=1, center_circle_radius=1)
+    fig, ax = radar.setup_axis(figsize=(8, 8))
+    radar.draw_circles(ax=ax, facecolor='#f3f3f3', edgecolor='#c5c5c5')
+    if compare_values is None:
+        radar.draw_radar(values, ax=ax, kwargs_radar={'facecolor': 'red', 'alpha': 0.6})
+        title = player_name
+    else:
+        radar.draw_radar_compare(values, compare_values, ax=ax,
+                                 kwargs_radar={'facecolor': 'red', 'alpha': 0.6},
+                                 kwargs_compare={'facecolor': 'blue', 'alpha': 0.6})
+        title = f"{player_name} (Red) vs {compare_name} (Blue)"
+    radar.draw_range_labels(ax=ax, fontsize=10)
+    radar.draw_param_labels(ax=ax, fontsize=12)
+    ax.set_title(f"{title}\nLeague Percentiles", fontsize=14)
+    return fig
@@ -1,9 +1,11 @@
 import streamlit as st
 from statsbombpy import sb
 import pandas as pd
-from mplsoccer import Pitch
-import matplotlib.pyplot as plt
-import ast
+import time
+import shared_store
+from xg_model import XGModel, model_version, fill_missing_xg
+from match_visuals import shot_map, event_columns, empty_shot_map, draw_shots
+from match_replay import MatchReplay, replay_ticks
 
 # Page configuration
 st.set_page_config(page_title="Football Shot Analysis", layout="wide")
@@ -27,76 +29,66 @@ def load_matches(comp_id, season_id):
     except Exception:
         return pd.DataFrame()
 
-# Load events data
+# Local xG model, trained with xg_model.py; keyed on the artifact version so a
+# newly trained or retrained model is picked up without restarting the app
+@st.cache_resource
+def load_xg_model(version):
+    if version is None:
+        return None
+    try:
+        return XGModel.load()
+    except Exception:
+        return None
+
+# Load events data; shots without StatsBomb xG are scored by the local model
 def load_events(match_id):
     try:
-        cache_key = f"events_{match_id}"
-        if cache_key not in st.session_state:
-            st.session_state[cache_key] = sb.events(match_id=match_id)
-        return st.session_state[cache_key]
+        if shared_store.enabled():
+            events = shared_store.load_events('statsbombpy', match_id, lambda: sb.events(match_id=match_id))
+        else:
+            cache_key = f"events_{match_id}"
+            if cache_key not in st.session_state:
+                st.session_state[cache_key] = sb.events(match_id=match_id)
+            events = st.session_state[cache_key]
+        model = load_xg_model(model_version())
+        return fill_missing_xg(events, model) if model is not None and not events.empty else events
     except Exception:
         return pd.DataFrame()
 
 # Create shot map
 def create_shot_map(events_df, team1, team2):
     try:
-        # Identify required columns dynamically
-        required_cols = {
-            'team': 'team' if 'team' in events_df.columns else 'team_name',
-            'type': 'type' if 'type' in events_df.columns else 'type_name',
-            'outcome': 'shot_outcome' if 'shot_outcome' in events_df.columns else 'outcome_name',
-            'player': 'player' if 'player' in events_df.columns else 'player_name',
-            'location': 'location' if 'location' in events_df.columns else None,
-            'x': 'x' if 'x' in events_df.columns else None,
-            'y': 'y' if 'y' in events_df.columns else None
-        }
-
-        shots = events_df[events_df[required_cols['type']] == 'Shot'].copy()
-        if shots.empty:
+        fig = shot_map(events_df, team1, team2)
+        if fig is None:
             st.warning("No shot data available for this match")
-            return None
-
-        pitch = Pitch(line_color='black', pitch_type='statsbomb')
-        fig, ax = pitch.draw(figsize=(12, 8))
-
-        team1_shots = shots[shots[required_cols['team']] == team1]
-        for _, shot in team1_shots.iterrows():
-            try:
-                if required_cols['x'] and required_cols['y'] and pd.notna(shot[required_cols['x']]) and pd.notna(shot[required_cols['y']]):
-                    x, y = shot[required_cols['x']], shot[required_cols['y']]
-                else:
-                    loc = shot[required_cols['location']]
-                    x, y = ast.literal_eval(loc) if isinstance(loc, str) else loc
-                if shot[required_cols['outcome']] == 'Goal':
-                    pitch.scatter(x, y, ax=ax, s=500, color='red', alpha=1)
-                    pitch.annotate(str(shot[required_cols['player']]), (x+1, y-2), ax=ax, fontsize=12)
-                else:
-                    pitch.scatter(x, y, ax=ax, s=300, color='red', alpha=0.3)
-            except Exception:
-                continue
-
-        team2_shots = shots[shots[required_cols['team']] == team2]
-        for _, shot in team2_shots.iterrows():
-            try:
-                if required_cols['x'] and required_cols['y'] and pd.notna(shot[required_cols['x']]) and pd.notna(shot[required_cols['y']]):
-                    x, y = shot[required_cols['x']], shot[required_cols['y']]
-                else:
-                    loc = shot[required_cols['location']]
-                    x, y = ast.literal_eval(loc) if isinstance(loc, str) else loc
-                if shot[required_cols['outcome']] == 'Goal':
-                    pitch.scatter(120-x, 80-y, ax=ax, s=500, color='blue', alpha=1)
-                    pitch.annotate(str(shot[required_cols['player']]), (120-x+1, 80-y-2), ax=ax, fontsize=12)
-                else:
-                    pitch.scatter(120-x, 80-y, ax=ax, s=300, color='blue', alpha=0.3)
-            except Exception:
-                continue
-
-        plt.title(f"{team1} (Red) vs {team2} (Blue) - Shot Map", fontsize=16)
         return fig
-
     except Exception as e:
         return None
 
+# Replay the match minute by minute, drawing only the shots of each new minute
+def replay_shot_map(events_df, team1, team2, delay):
+    cols = event_columns(events_df)
+    pitch, fig, ax = empty_shot_map(team1, team2)
+    replay = MatchReplay(team1, team2)
+    clock_slot = st.empty()
+    map_slot = st.empty()
+    metrics_slot = st.empty()
+
+    for i, (period, minute, batch) in enumerate(replay_ticks(events_df)):
+        new_shots, _ = replay.update(batch)
+        clock_slot.markdown(f"**Minute {minute}'** (period {period})")
+        if i == 0 or not new_shots.empty:
+            draw_shots(pitch, ax, new_shots, team1, team2, cols)
+            map_slot.pyplot(fig)
+            with metrics_slot.container():
+                col1, col2 = st.columns(2)
+                for col, team in ((col1, team1), (col2, team2)):
+                    with col:
+                        st.metric(f"{team} Shots", replay.shots.get(team, 0))
+                        st.metric("Goals", replay.goals.get(team, 0))
+                        st.metric("xG", f"{replay.xg.get(team, 0.0):.2f}")
+        time.sleep(delay)
+
 # Main app
 def main():
     if 'analyze' not in st.session_state:
@@ -137,7 +129,18 @@ def main():
             st.warning("No competitions available")
             st.session_state.analyze = False
 
-    if st.session_state.get('analyze', False):
+        st.markdown("### ⏱️ Replay")
+        replay_mode = st.checkbox("Replay mode", key='replay_mode')
+        replay_delay = st.slider("Seconds per match minute", 0.0, 2.0, 0.5, step=0.1, key='replay_delay')
+
+    if st.session_state.get('analyze', False) and replay_mode:
+        st.header(f"Shot Replay: {st.session_state.home_team} vs {st.session_state.away_team}")
+        events = load_events(st.session_state.match_id)
+        if events.empty:
+            st.warning("No event data available for this match")
+        elif st.button("▶️ Start Replay"):
+            replay_shot_map(events, st.session_state.home_team, st.session_state.away_team, replay_delay)
+    elif st.session_state.get('analyze', False):
         st.header(f"Shot Analysis: {st.session_state.home_team} vs {st.session_state.away_team}")
         with st.spinner("Loading match data..."):
             events = load_events(st.session_state.match_id)
@@ -158,9 +161,13 @@ def main():
                     with col1:
                         st.metric(f"{st.session_state.home_team} Shots", len(home_shots))
                         st.metric("Goals", len(home_shots[home_shots[outcome_col] == 'Goal']))
+                        if 'shot_statsbomb_xg' in events.columns:
+                            st.metric("xG", f"{home_shots['shot_statsbomb_xg'].sum():.2f}")
                     with col2:
                         st.metric(f"{st.session_state.away_team} Shots", len(away_shots))
                         st.metric("Goals", len(away_shots[away_shots[outcome_col] == 'Goal']))
+                        if 'shot_statsbomb_xg' in events.columns:
+                            st.metric("xG", f"{away_shots['shot_statsbomb_xg'].sum():.2f}")
                 else:
                     st.warning("Could not generate shot map")
             else:
@@ -1,7 +1,10 @@
 import streamlit as st
-from mplsoccer import Sbopen, Pitch
+from mplsoccer import Sbopen
 import pandas as pd
-import matplotlib.pyplot as plt
+import time
+import shared_store
+from match_visuals import pass_map, empty_pass_map, draw_passes
+from match_replay import MatchReplay, replay_ticks
 
 # Page configuration
 st.set_page_config(page_title="Player Pass Analysis", layout="wide")
@@ -30,7 +33,7 @@ def load_matches(comp_id, season_id):
 
 # Load match events
 @st.cache_data
-def load_events(match_id):
+def fetch_events(match_id):
     try:
         df, _, _, _ = parser.event(match_id=match_id)
         return df
@@ -38,33 +41,54 @@ def load_events(match_id):
         st.error(f"Error loading match events: {str(e)}")
         return pd.DataFrame()
 
+# The shared store is already memory-mapped; cache_data would pickle a private copy per worker
+def load_events(match_id):
+    if not shared_store.enabled():
+        return fetch_events(match_id)
+    try:
+        return shared_store.load_events('sbopen', match_id, lambda: parser.event(match_id=match_id)[0])
+    except Exception as e:
+        st.error(f"Error loading match events: {str(e)}")
+        return pd.DataFrame()
+
 # Create pass map visualization
 def create_pass_map(df_pass, player_name):
     try:
-        pitch = Pitch(line_color='black', pitch_type='statsbomb')
-        fig, ax = pitch.draw(figsize=(12, 8))
-        
-        for _, row in df_pass.iterrows():
-            color = 'green' if pd.isna(row['outcome_name']) else 'red'
-            pitch.arrows(row['x'], row['y'], row['end_x'], row['end_y'],
-                        color=color, ax=ax, width=2, headwidth=4, headlength=4)
-            pitch.scatter(row['x'], row['y'], alpha=0.5, s=200, color=color, ax=ax)
-        
-        successful = df_pass['outcome_name'].isna().sum()
-        failed = len(df_pass) - successful
-        accuracy = successful / len(df_pass) * 100 if len(df_pass) > 0 else 0
-        
-        stats_text = f"Successful: {successful}\nFailed: {failed}\nAccuracy: {accuracy:.1f}%"
-        ax.text(110, 80, stats_text, fontsize=12, color='black',
-               ha='right', bbox=dict(facecolor='white', alpha=0.8, edgecolor='black'))
-        
-        plt.title(f"Pass Analysis for {player_name}\nGreen = Accurate   |   Red = Inaccurate", fontsize=14)
-        return fig
-    
+        return pass_map(df_pass, player_name)
     except Exception as e:
         st.error(f"Error creating pass map: {str(e)}")
         return None
 
+# Replay the match minute by minute, drawing only the player's new passes
+def replay_pass_map(events, player_name, delay):
+    pitch, fig, ax = empty_pass_map(player_name)
+    teams = events['team_name'].dropna().unique()[:2]
+    replay = MatchReplay(*teams)
+    player_team = events.loc[events['player_name'] == player_name, 'team_name'].iloc[0]
+    clock_slot = st.empty()
+    map_slot = st.empty()
+    metrics_slot = st.empty()
+
+    for i, (period, minute, batch) in enumerate(replay_ticks(events)):
+        _, new_passes = replay.update(batch)
+        new_passes = new_passes[new_passes['player_name'] == player_name]
+        clock_slot.markdown(f"**Minute {minute}'** (period {period})")
+        if i == 0 or not new_passes.empty:
+            draw_passes(pitch, ax, new_passes)
+            map_slot.pyplot(fig)
+            total_passes, successful_passes = replay.player_passes.get(player_name, [0, 0])
+            with metrics_slot.container():
+                col1, col2, col3, col4 = st.columns(4)
+                with col1:
+                    st.metric("Total Passes", total_passes)
+                with col2:
+                    st.metric("Successful Passes", successful_passes)
+                with col3:
+                    st.metric("Pass Accuracy", f"{replay.pass_accuracy(player_name):.1f}%")
+                with col4:
+                    st.metric(f"{player_team} Pass Accuracy", f"{replay.pass_accuracy(player_team):.1f}%")
+        time.sleep(delay)
+
 def main():
     with st.sidebar:
         st.header("Match Selection")
@@ -124,8 +148,18 @@ def main():
                 st.warning("No matches available for this season")
         else:
             st.warning("No competitions available")
+
+        st.markdown("### ⏱️ Replay")
+        replay_mode = st.checkbox("Replay mode", key='replay_mode')
+        replay_delay = st.slider("Seconds per match minute", 0.0, 2.0, 0.5, step=0.1, key='replay_delay')
     
-    if hasattr(st.session_state, 'selected_player'):
+    if hasattr(st.session_state, 'selected_player') and replay_mode:
+        st.header(f"Pass Replay for: {st.session_state.selected_player}")
+        if st.session_state.selected_player not in events['player_name'].values:
+            st.warning("No pass data available for this player in the selected match")
+        elif st.button("▶️ Start Replay"):
+            replay_pass_map(events, st.session_state.selected_player, replay_delay)
+    elif hasattr(st.session_state, 'selected_player'):
         st.header(f"Pass Analysis for: {st.session_state.selected_player}")
         
         mask_player = (events['type_name'] == 'Pass') & (events['player_name'] == st.session_state.selected_player)
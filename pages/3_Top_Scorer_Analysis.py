@@ -1,8 +1,10 @@
 import streamlit as st
-from mplsoccer import VerticalPitch
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 from statsbombpy import sb
+import shared_store
+from xg_model import XGModel, model_version, fill_missing_xg, score_events
+from match_visuals import player_shot_map, what_if_map
 
 # Page configuration
 st.set_page_config(page_title="Shot Analysis System", layout="wide", page_icon="⚽")
@@ -18,15 +20,85 @@ def get_available_competitions():
         st.error(f"Error loading competitions: {str(e)}")
         return pd.DataFrame()
 
+# Local xG model, trained with xg_model.py; keyed on the artifact version so a
+# newly trained or retrained model is picked up without restarting the app
+@st.cache_resource
+def load_xg_model(version):
+    if version is None:
+        return None
+    try:
+        return XGModel.load()
+    except Exception:
+        return None
+
+# Reruns on its own, so dragging a shot only scores that shot instead of reloading the season
+@st.fragment
+def what_if_panel(model, default_body_part=None):
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        x = st.slider("Distance up the pitch (x)", 60.0, 120.0, 108.0, step=0.5)
+        y = st.slider("Width (y)", 0.0, 80.0, 40.0, step=0.5)
+        body_parts = model.categories('body_part')
+        body_part = st.selectbox("Body Part", body_parts,
+                                 index=body_parts.index(default_body_part) if default_body_part in body_parts else 0)
+        shot_type = st.selectbox("Shot Type", model.categories('shot_type'))
+        assist_type = st.selectbox("Assist", ['None'] + [a for a in model.categories('assist_type') if a != 'None'])
+        xg = model.predict_one(x, y, body_part, shot_type, assist_type)
+        st.metric("xG", f"{xg:.3f}")
+    with col2:
+        st.pyplot(what_if_map(x, y, xg))
+
 def safe_extract_coordinates(df, col_name):
-    """Safely extract coordinates from a column"""
+    """Safely extract coordinates from a column; Arrow-backed shared frames hold arrays"""
     if col_name in df.columns:
         return df[col_name].apply(
-            lambda loc: pd.Series({'x': loc[0], 'y': loc[1]}) if isinstance(loc, list) and len(loc) >= 2 
+            lambda loc: pd.Series({'x': loc[0], 'y': loc[1]}) if isinstance(loc, (list, np.ndarray)) and len(loc) >= 2 
             else pd.Series({'x': None, 'y': None})
         )
     return pd.DataFrame({'x': [None]*len(df), 'y': [None]*len(df)})
 
+# Every shot the team took in the season; cached so player picks and reruns skip the event downloads,
+# keyed on the model version so a retrained model rescores
+@st.cache_data(show_spinner=False)
+def load_team_shots(comp_id, season_id, team, xg_version=None, _model=None):
+    matches = sb.matches(competition_id=comp_id, season_id=season_id)
+    if matches.empty:
+        return None
+
+    all_shots = []
+    for i, match_id in enumerate(matches['match_id']):
+        try:
+            match = matches[matches['match_id'] == match_id].iloc[0]
+            if team not in [match['home_team'], match['away_team']]:
+                continue
+
+            if shared_store.enabled():
+                match_events = shared_store.load_events('statsbombpy', match_id, lambda: sb.events(match_id=match_id))
+            else:
+                match_events = sb.events(match_id=match_id)
+
+            if not match_events.empty:
+                loc_data = safe_extract_coordinates(match_events, 'location')
+                match_events['x'] = loc_data['x']
+                match_events['y'] = loc_data['y']
+                if _model is not None:
+                    model_xg = score_events(match_events, _model)
+                    match_events = fill_missing_xg(match_events, _model, scores=model_xg)
+                    match_events['model_xg'] = model_xg
+
+                shots = match_events[
+                    (match_events['type'] == "Shot") & 
+                    (match_events['shot_type'] != "Penalty") &
+                    (match_events['x'].notna()) &
+                    (match_events['team'] == team)
+                ]
+                all_shots.append(shots)
+        except Exception as e:
+            st.warning(f"Couldn't process match {match_id}: {str(e)}")
+            continue
+
+    return pd.concat(all_shots) if all_shots else pd.DataFrame()
+
 # Sidebar UI
 with st.sidebar:
     st.header("Data Selection")
@@ -66,51 +138,26 @@ with st.sidebar:
         except Exception as e:
             st.error(f"Failed to load teams: {str(e)}")
 
+    local_version = model_version()
+    local_model = load_xg_model(local_version)
+    if local_model is not None:
+        xg_source = st.radio("xG Source", ["StatsBomb", "Local model"])
+    else:
+        xg_source = "StatsBomb"
+        st.caption("Train a local xG model with `python xg_model.py train` for what-if shots.")
+xg_col = 'model_xg' if xg_source == "Local model" else 'shot_statsbomb_xg'
+
 # Data Processing
 if hasattr(st.session_state, 'comp_id'):
     with st.spinner("Loading match data..."):
         try:
-            matches = sb.matches(
-                competition_id=st.session_state.comp_id,
-                season_id=st.session_state.season_id
-            )
-            
             selected_team = st.session_state.team
+            shots_df = load_team_shots(st.session_state.comp_id, st.session_state.season_id, selected_team,
+                                       local_version if local_model is not None else None, local_model)
 
-            if not matches.empty:
-                all_shots = []
-                all_goals = []
-
-                for i, match_id in enumerate(matches['match_id']):
-                    try:
-                        match = matches[matches['match_id'] == match_id].iloc[0]
-                        if selected_team not in [match['home_team'], match['away_team']]:
-                            continue
-
-                        match_events = sb.events(match_id=match_id)
-
-                        if not match_events.empty:
-                            loc_data = safe_extract_coordinates(match_events, 'location')
-                            match_events['x'] = loc_data['x']
-                            match_events['y'] = loc_data['y']
-
-                            shots = match_events[
-                                (match_events['type'] == "Shot") & 
-                                (match_events['shot_type'] != "Penalty") &
-                                (match_events['x'].notna()) &
-                                (match_events['team'] == selected_team)
-                            ]
-                            goals = shots[shots['shot_outcome'] == "Goal"]
-
-                            all_shots.append(shots)
-                            all_goals.append(goals)
-                    except Exception as e:
-                        st.warning(f"Couldn't process match {match_id}: {str(e)}")
-                        continue
-
-                if all_shots:
-                    shots_df = pd.concat(all_shots)
-                    goals_df = pd.concat(all_goals)
+            if shots_df is not None:
+                if not shots_df.empty:
+                    goals_df = shots_df[shots_df['shot_outcome'] == "Goal"]
 
                     stats = []
                     for (player, team), group in shots_df.groupby(['player', 'team']):
@@ -119,7 +166,7 @@ if hasattr(st.session_state, 'comp_id'):
                             'Team': team,
                             'Shots': len(group),
                             'Goals': len(goals_df[goals_df['player'] == player]),
-                            'xG': round(group['shot_statsbomb_xg'].sum(), 2)
+                            'xG': round(group[xg_col].sum(), 2)
                         })
 
                     stats_df = pd.DataFrame(stats).sort_values('xG', ascending=False)
@@ -132,27 +179,13 @@ if hasattr(st.session_state, 'comp_id'):
                         player_shots = shots_df[shots_df['player'] == selected_player]
                         player_goals = goals_df[goals_df['player'] == selected_player]
 
-                        pitch = VerticalPitch(pitch_type='statsbomb', half=True)
-                        fig, ax = pitch.draw(figsize=(12, 8))
-
-                        if not player_shots.empty:
-                            pitch.scatter(
-                                player_shots['x'], player_shots['y'],
-                                s=player_shots['shot_statsbomb_xg'] * 500 + 100,
-                                c='red', alpha=0.6, label='Shots', ax=ax
-                            )
-
-                        if not player_goals.empty:
-                            pitch.scatter(
-                                player_goals['x'], player_goals['y'],
-                                s=player_goals['shot_statsbomb_xg'] * 500 + 100,
-                                c='white', edgecolors='blue',
-                                marker='football', label='Goals', ax=ax
-                            )
-
-                        ax.legend(loc='center')
-                        plt.title(f"{selected_player} Shot Map")
+                        fig = player_shot_map(player_shots, player_goals, selected_player, xg_col=xg_col)
                         st.pyplot(fig)
+
+                        if local_model is not None:
+                            usual = player_shots['shot_body_part'].mode() if 'shot_body_part' in player_shots.columns else pd.Series(dtype=object)
+                            with st.expander("🎯 What-if xG"):
+                                what_if_panel(local_model, usual.iloc[0] if not usual.empty else None)
                 else:
                     st.warning("No shot data available for this team")
             else:
@@ -1,16 +1,17 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.preprocessing import LabelEncoder
 from imblearn.over_sampling import SMOTE
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report
+from formation_matchups import build_matchup_table
+import shared_store
 
 st.set_page_config(page_title="Counter Formation Predictor", layout="wide")
 
 @st.cache_data
-def load_data():
+def load_csv_data():
     try:
         df = pd.read_csv('merged2_output.csv')
 
@@ -19,6 +20,20 @@ def load_data():
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
 
+def load_data():
+    # In shared mode every worker maps the same Arrow copy instead of caching its own
+    if shared_store.enabled():
+        try:
+            return shared_store.load_csv('merged2_output.csv')
+        except Exception as e:
+            st.error(f"Error loading shared data: {str(e)}")
+            return pd.DataFrame()
+    return load_csv_data()
+
+@st.cache_data
+def load_matchup_table(df):
+    return build_matchup_table(df)
+
 def preprocess_data(df):
     try:
         df = df.drop(columns=['Opponent', 'Result', 'Winning Team'])
@@ -61,16 +76,22 @@ def prepare_model_input(df):
 
     return X_resampled, y_resampled
 
-@st.cache_data
+@st.cache_resource
 def train_model(X_train, y_train):
     try:
-        rf_model = RandomForestClassifier(criterion='gini', n_estimators=100, max_depth=10, random_state=33)
-        rf_model.fit(X_train, y_train)
-        return rf_model
+        if shared_store.enabled():
+            key = shared_store.fingerprint(X_train, y_train)
+            return shared_store.load_or_fit('formation_rf', key, lambda: fit_model(X_train, y_train))
+        return fit_model(X_train, y_train)
     except Exception as e:
         st.error(f"Error training model: {str(e)}")
         return None
 
+def fit_model(X_train, y_train):
+    rf_model = RandomForestClassifier(criterion='gini', n_estimators=100, max_depth=10, random_state=33)
+    rf_model.fit(X_train, y_train)
+    return rf_model
+
 def predict_counter_formation(user_formation, winning_encoder, losing_encoder, rf_model, median_values):
     encoded_input = losing_encoder.transform([user_formation])[0]
     input_data = [[
@@ -99,10 +120,14 @@ def main():
         st.warning("No data available.")
         return
 
+    matchups = load_matchup_table(df)
+
     df, winning_encoder, losing_encoder = preprocess_data(df)
-    X_resampled, y_resampled = prepare_model_input(df)
-    X_train, X_test, y_train, y_test = train_test_split(X_resampled, y_resampled, test_size=0.2, random_state=44)
-    rf_model = train_model(X_train, y_train)
+
+    def fit_forest():
+        X_resampled, y_resampled = prepare_model_input(df)
+        X_train, X_test, y_train, y_test = train_test_split(X_resampled, y_resampled, test_size=0.2, random_state=44)
+        return train_model(X_train, y_train), X_test, y_test
 
     median_values = {
         'winning_goals': df['Winning Team Goals'].median(),
@@ -116,27 +141,55 @@ def main():
     }
 
     if page == "🎯 Predict the Lineup":
-        trained_formations = winning_encoder.inverse_transform(np.unique(y_resampled))
-        user_formation = st.selectbox("Select your formation:", trained_formations)
+        user_formation = st.selectbox("Select opponent formation:", matchups.formations())
+        min_matches = st.sidebar.slider("Minimum matches per matchup", 1, 20, 3)
+        use_forest = st.sidebar.checkbox("Random Forest second opinion", value=False)
 
         if st.button("🎯 Get Counter Formation"):
-            predicted_formation = predict_counter_formation(
-                user_formation, winning_encoder, losing_encoder, rf_model, median_values
-            )
+            counters = matchups.counters(user_formation, min_matches=min_matches)
             st.session_state['user_formation'] = user_formation
-            st.session_state['predicted_formation'] = predicted_formation
-
-        if 'predicted_formation' in st.session_state:
-            st.success(f"Suggested counter formation against **{st.session_state['user_formation']}** is: **{st.session_state['predicted_formation']}**")
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown(f"**Your Formation:** {st.session_state['user_formation']}")
-            with col2:
-                st.markdown(f"**Counter Formation:** {st.session_state['predicted_formation']}")
+            st.session_state['min_matches'] = min_matches
+            st.session_state['counters'] = counters
+            st.session_state['predicted_formation'] = counters['Formation'].iloc[0] if not counters.empty else None
+            st.session_state.pop('forest_formation', None)
+            if use_forest:
+                if user_formation in losing_encoder.classes_:
+                    rf_model, _, _ = fit_forest()
+                    st.session_state['forest_formation'] = predict_counter_formation(
+                        user_formation, winning_encoder, losing_encoder, rf_model, median_values
+                    )
+                else:
+                    st.session_state['forest_formation'] = None
+
+        if 'counters' in st.session_state:
+            counters = st.session_state['counters']
+            if st.session_state['predicted_formation'] is None:
+                st.warning(f"No formation has faced **{st.session_state['user_formation']}** at least {st.session_state['min_matches']} times.")
+            else:
+                best = counters.iloc[0]
+                st.success(f"Suggested counter formation against **{st.session_state['user_formation']}** is: **{st.session_state['predicted_formation']}**")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Win Rate", f"{best['Win Rate'] * 100:.1f}%")
+                with col2:
+                    st.metric("Mean xG Diff", f"{best['Mean xG Diff']:+.2f}")
+                with col3:
+                    st.metric("Matches", int(best['Matches']))
+                st.dataframe(counters.style.format({
+                    'Win Rate': "{:.1%}", 'Draw Rate': "{:.1%}", 'Loss Rate': "{:.1%}",
+                    'Expected Points': "{:.2f}", 'Mean xG Diff': "{:+.2f}"
+                }))
+            if 'forest_formation' in st.session_state:
+                if st.session_state['forest_formation'] is None:
+                    st.info(f"The Random Forest has never seen **{st.session_state['user_formation']}** "
+                            "as a losing formation, so it has no second opinion.")
+                else:
+                    st.info(f"Random Forest second opinion: **{st.session_state['forest_formation']}**")
 
     elif page == "📊 Model Evaluation":
         st.header("📊 Model Evaluation Report")
 
+        rf_model, X_test, y_test = fit_forest()
         y_pred = rf_model.predict(X_test)
         y_test_names = winning_encoder.inverse_transform(y_test)
         y_pred_names = winning_encoder.inverse_transform(y_pred)
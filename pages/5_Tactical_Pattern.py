@@ -8,12 +8,15 @@ from sklearn.metrics import classification_report
 from sklearn.preprocessing import StandardScaler
 from imblearn.over_sampling import SMOTE
 from imblearn.pipeline import make_pipeline
+import os
+import shared_store
+from possession_chains import SEQUENCE_FEATURES, add_sequence_features
 
 # Page configuration
 st.set_page_config(page_title="Football Tactics Classifier", layout="wide")
 
 @st.cache_data
-def load_data():
+def load_csv_data():
     try:
         df = pd.read_csv('match_anlayze.csv')
         return df
@@ -21,6 +24,24 @@ def load_data():
         st.error(f"Error loading data: {str(e)}")
         return pd.DataFrame()
 
+def load_data():
+    # In shared mode every worker maps the same Arrow copy instead of caching its own
+    if shared_store.enabled():
+        try:
+            return shared_store.load_csv('match_anlayze.csv')
+        except Exception as e:
+            st.error(f"Error loading shared data: {str(e)}")
+            return pd.DataFrame()
+    return load_csv_data()
+
+@st.cache_data
+def load_sequence_features():
+    try:
+        return pd.read_csv(SEQUENCE_FEATURES)
+    except Exception as e:
+        st.error(f"Error loading sequence features: {str(e)}")
+        return pd.DataFrame()
+
 def preprocess_data(df):
     try:
         df = df.drop(columns=['match_id', 'competition', 'season', 'team', 'counter_attacks', 'successful_passes'])
@@ -50,27 +71,33 @@ def perform_clustering(df):
         st.error(f"Clustering error: {str(e)}")
         return df, None, None
 
-@st.cache_data
+@st.cache_resource
 def train_model(X_train, y_train):
     try:
-        model = make_pipeline(
-            StandardScaler(),
-            SMOTE(random_state=42),
-            RandomForestClassifier(
-                criterion='gini',
-                n_estimators=200,
-                max_depth=10,
-                class_weight='balanced',
-                random_state=33,
-                n_jobs=-1
-            )
-        )
-        model.fit(X_train, y_train)
-        return model
+        if shared_store.enabled():
+            key = shared_store.fingerprint(X_train, y_train)
+            return shared_store.load_or_fit('tactical_rf', key, lambda: fit_model(X_train, y_train))
+        return fit_model(X_train, y_train)
     except Exception as e:
         st.error(f"Model training error: {str(e)}")
         return None
 
+def fit_model(X_train, y_train):
+    model = make_pipeline(
+        StandardScaler(),
+        SMOTE(random_state=42),
+        RandomForestClassifier(
+            criterion='gini',
+            n_estimators=200,
+            max_depth=10,
+            class_weight='balanced',
+            random_state=33,
+            n_jobs=-1
+        )
+    )
+    model.fit(X_train, y_train)
+    return model
+
 def main():
     st.title("Football Tactics Classification System with AI")
 
@@ -82,13 +109,34 @@ def main():
         st.warning("No data available. Please check data file path.")
         return
 
-    df = preprocess_data(df)
-    df, kmeans_model, scaler = perform_clustering(df)
+    # Possession-chain features exist only for seasons built with possession_chains.py
+    use_sequences = st.sidebar.checkbox(
+        "Include possession-chain features",
+        value=False,
+        disabled=not os.path.exists(SEQUENCE_FEATURES)
+    )
+
+    # Tactics are always clustered on the original stats of every match, so the
+    # cluster names keep their meaning; sequence features only feed the classifier
+    clustered, kmeans_model, scaler = perform_clustering(preprocess_data(df))
 
     if not (kmeans_model and scaler):
         st.error("Clustering failed.")
         return
 
+    if use_sequences:
+        df = df.assign(Cluster=clustered['Cluster'], Tactic=clustered['Tactic'])
+        sequence_features = load_sequence_features()
+        if not sequence_features.empty:
+            df = add_sequence_features(df, sequence_features)
+            st.sidebar.caption(f"{len(df)} team-matches have possession-chain features")
+        if df.empty:
+            st.warning("No matches have possession-chain features yet.")
+            return
+        df = preprocess_data(df)
+    else:
+        df = clustered
+
     X = df.drop(['Cluster', 'Tactic'], axis=1)
     y = df['Tactic']
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=44, shuffle=True)
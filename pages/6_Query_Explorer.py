@@ -0,0 +1,86 @@
+import streamlit as st
+import time
+import query_engine
+
+# Page configuration
+st.set_page_config(page_title="SQL Query Explorer", layout="wide")
+st.title("🔎 SQL Query Explorer")
+
+EXAMPLE_QUERIES = {
+    "Top scorers by non-penalty xG": """SELECT player_name, team_name,
+       COUNT(*) AS shots,
+       COUNT(*) FILTER (WHERE outcome_name = 'Goal') AS goals,
+       ROUND(SUM(shot_statsbomb_xg), 2) AS xg
+FROM events
+WHERE type_name = 'Shot' AND sub_type_name <> 'Penalty'
+GROUP BY ALL
+ORDER BY xg DESC
+LIMIT 20""",
+    "Team pass accuracy per match": """SELECT match_id, team_name,
+       COUNT(*) AS passes,
+       ROUND(100.0 * COUNT(*) FILTER (WHERE outcome_name IS NULL) / COUNT(*), 1) AS pass_accuracy
+FROM events
+WHERE type_name = 'Pass'
+GROUP BY ALL
+ORDER BY match_id, team_name""",
+    "Most successful formations": """SELECT "Winning Team Formation" AS formation,
+       COUNT(*) AS wins,
+       ROUND(AVG("Winning Team xG" - "Losing Team xG"), 2) AS mean_xg_diff
+FROM formation_results
+WHERE "Winning Team" <> 'Draw'
+GROUP BY ALL
+ORDER BY wins DESC""",
+    "Possession vs pass success by competition": """SELECT competition, season,
+       ROUND(AVG(possession_percentage), 1) AS possession,
+       ROUND(AVG(pass_success_rate), 1) AS pass_success_rate
+FROM team_match_stats
+GROUP BY ALL
+ORDER BY competition, season""",
+}
+
+# Schema only changes when datasets or cached matches change
+@st.cache_data
+def load_schema(data_version):
+    try:
+        return query_engine.schema()
+    except Exception as e:
+        st.error(f"Error loading tables: {str(e)}")
+        return {}
+
+def main():
+    with st.sidebar:
+        st.header("Tables")
+        for view, columns in load_schema(query_engine.data_version()).items():
+            with st.expander(view):
+                st.dataframe(columns, hide_index=True)
+        st.caption(f"{len(query_engine.cached_match_ids())} matches cached. "
+                   "Add more with `python query_engine.py cache --competition-id ... --season-id ...`")
+
+    example = st.selectbox("Example queries", list(EXAMPLE_QUERIES))
+    sql = st.text_area("SQL", value=EXAMPLE_QUERIES[example], height=220)
+
+    if st.button("Run Query"):
+        start = time.perf_counter()
+        try:
+            result, cached = query_engine.query(sql)
+            st.session_state['query_result'] = (result, cached, time.perf_counter() - start)
+        except query_engine.QueryError as e:
+            st.session_state.pop('query_result', None)
+            st.error(f"Query failed: {str(e)}")
+
+    if 'query_result' in st.session_state:
+        result, cached, elapsed = st.session_state['query_result']
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Rows", len(result))
+        with col2:
+            st.metric("Time", f"{elapsed * 1000:.0f} ms")
+        with col3:
+            st.metric("Source", "Cache" if cached else "DuckDB")
+        st.dataframe(result)
+        st.caption("Results are cached until new data is added; queries using random(), now() "
+                   "or other volatile functions always run fresh.")
+        st.download_button("Download CSV", result.to_csv(index=False), file_name="query_result.csv", mime="text/csv")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import streamlit as st
+import pandas as pd
+from player_profiles import PLAYER_PROFILES, PROFILE_COLUMNS, compare_players
+from match_visuals import percentile_radar
+
+# Page configuration
+st.set_page_config(page_title="Player Comparison", layout="wide")
+st.title("📐 Player Comparison - Per 90 & League Percentiles")
+
+PARAM_LABELS = {
+    'shots_p90': 'Shots p90',
+    'xg_p90': 'xG p90',
+    'npxg_p90': 'npxG p90',
+    'passes_p90': 'Passes p90',
+    'pass_accuracy': 'Pass %',
+    'pressures_p90': 'Pressures p90',
+}
+
+# Profiles are precomputed with player_profiles.py
+@st.cache_data
+def load_profiles():
+    try:
+        profiles = pd.read_csv(PLAYER_PROFILES, dtype={'competition_name': str, 'season_name': str})
+        # Profiles built before names were stored are labelled by id
+        for col in ['competition', 'season']:
+            if f"{col}_name" not in profiles.columns:
+                profiles[f"{col}_name"] = None
+            ids = profiles[f"{col}_id"].astype(str)
+            profiles[f"{col}_name"] = profiles[f"{col}_name"].fillna(f"{col.title()} " + ids)
+        return profiles
+    except Exception as e:
+        st.error(f"Error loading player profiles: {str(e)}")
+        return pd.DataFrame()
+
+def main():
+    profiles = load_profiles()
+    if profiles.empty:
+        st.warning("No player profiles available. Build them with "
+                   "`python player_profiles.py --competition-id ... --season-id ...`")
+        return
+
+    with st.sidebar:
+        st.header("Player Selection")
+        selected_comp = st.selectbox("Select Competition", profiles['competition_name'].unique())
+        filtered_seasons = profiles[profiles['competition_name'] == selected_comp]
+        selected_season = st.selectbox("Select Season", filtered_seasons['season_name'].unique())
+        league = filtered_seasons[filtered_seasons['season_name'] == selected_season]
+
+        ranked = league.dropna(subset=[f"{col}_pct" for col in PROFILE_COLUMNS], how='all')
+        players = ranked.sort_values('minutes', ascending=False)['player_name'].tolist()
+        player = st.selectbox("Select Player", players, index=None, placeholder="Start typing to search...")
+        compare_with = st.selectbox("Compare With (optional)", [p for p in players if p != player],
+                                    index=None, placeholder="Start typing to search...")
+
+    if player:
+        table = compare_players(ranked, [player] + ([compare_with] if compare_with else []))
+        params = [PARAM_LABELS[col] for col in PROFILE_COLUMNS]
+        values = table[[f"{col}_pct" for col in PROFILE_COLUMNS]].fillna(0).values
+        if compare_with:
+            fig = percentile_radar(params, values[0], player, values[1], compare_with)
+        else:
+            fig = percentile_radar(params, values[0], player)
+
+        col1, col2 = st.columns([3, 2])
+        with col1:
+            st.pyplot(fig)
+        with col2:
+            st.subheader("Per 90")
+            summary = table[['team_name', 'matches', 'minutes'] + PROFILE_COLUMNS].round(2).T.astype(str)
+            st.dataframe(summary)
+            st.caption("Percentiles rank players against everyone in the competition with enough minutes.")
+
+    st.subheader("League Leaders")
+    stat_label = st.selectbox("Rank by", list(PARAM_LABELS.values()))
+    stat = next(col for col, label in PARAM_LABELS.items() if label == stat_label)
+    leaders = ranked.sort_values(stat, ascending=False)[['player_name', 'team_name', 'minutes', stat, f"{stat}_pct"]]
+    st.dataframe(leaders.head(20).round(2), hide_index=True)
+
+if __name__ == "__main__":
+    main()
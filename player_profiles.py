@@ -0,0 +1,172 @@
+"""Per-90 player profiles and league-wide percentiles for a competition.
+
+Minutes played are derived from the event stream (mplsoccer Sbopen layout):
+every player with an event who was not brought on started the match, a
+substitute's minutes start at the ``Substitution`` event that brought them on,
+and a player's minutes end when they are substituted, sent off, leave with a
+``Player Off`` event that no ``Player On`` follows or the match ends. Time off
+for treatment between a ``Player Off`` and its ``Player On`` is not counted.
+Counting stats are summed over the competition, turned into per-90 rates and
+ranked with vectorized percentile ranks, so comparing players is a row lookup.
+
+    python player_profiles.py --competition-id 11 --season-id 1
+"""
+import argparse
+import os
+
+import pandas as pd
+from mplsoccer import Sbopen
+
+import shared_store
+
+PLAYER_PROFILES = 'player_profiles.csv'
+COUNT_COLUMNS = ['shots', 'xg', 'npxg', 'passes', 'successful_passes', 'pressures']
+PROFILE_COLUMNS = ['shots_p90', 'xg_p90', 'npxg_p90', 'passes_p90', 'pass_accuracy', 'pressures_p90']
+RED_CARDS = ['Red Card', 'Second Yellow']
+
+
+def _match_time(events):
+    return events['minute'] + events['second'] / 60
+
+
+def player_minutes(events):
+    """Minutes played per (player_name, team_name) in one match"""
+    t = _match_time(events)
+    match_end = t.max()
+
+    players = events.dropna(subset=['player_name']).groupby('player_name')['team_name'].first()
+    subs = events[events['type_name'] == 'Substitution']
+    if 'substitution_replacement_name' in subs.columns:
+        subbed_on = pd.Series(t[subs.index].values, index=subs['substitution_replacement_name'].values)
+        subbed_on = subbed_on[~subbed_on.index.duplicated()]
+        players = pd.concat([players, pd.Series(subs['team_name'].values, index=subs['substitution_replacement_name'].values)])
+        players = players[~players.index.duplicated()]
+    else:
+        subbed_on = pd.Series(dtype=float)
+
+    # A Player Off followed by a Player On (injury treatment) is a break, not an exit
+    off = pd.DataFrame({'t': t, 'player_name': events['player_name']})[events['type_name'] == 'Player Off']
+    on = pd.DataFrame({'back': t, 'player_name': events['player_name']})[events['type_name'] == 'Player On']
+    breaks = pd.merge_asof(off.sort_values('t'), on.sort_values('back'), left_on='t', right_on='back',
+                           by='player_name', direction='forward')
+
+    leaving = events['type_name'] == 'Substitution'
+    for col in [col for col in events.columns if col.endswith('card_name')]:
+        leaving |= events[col].isin(RED_CARDS)
+    exits = pd.concat([
+        t[leaving].groupby(events.loc[leaving, 'player_name']).min(),
+        breaks[breaks['back'].isna()].groupby('player_name')['t'].min(),
+    ])
+    left_at = exits.groupby(level=0).min()
+
+    start = subbed_on.reindex(players.index).fillna(0.0)
+    end = left_at.reindex(players.index).fillna(match_end).clip(upper=match_end)
+    returned = breaks.dropna(subset=['back'])
+    gap = (returned['back'].clip(upper=returned['player_name'].map(end)) - returned['t']).clip(lower=0)
+    off_pitch = gap.groupby(returned['player_name']).sum().reindex(players.index).fillna(0.0)
+    return pd.DataFrame({
+        'player_name': players.index,
+        'team_name': players.values,
+        'minutes': (end - start - off_pitch).clip(lower=0).values,
+    })
+
+
+def player_match_stats(events):
+    """Minutes and counting stats per player for one match"""
+    event_type = events['type_name']
+    xg = events['shot_statsbomb_xg'].fillna(0.0) if 'shot_statsbomb_xg' in events.columns else pd.Series(0.0, index=events.index)
+    is_shot = event_type == 'Shot'
+    is_pass = event_type == 'Pass'
+    penalty = events['sub_type_name'] == 'Penalty' if 'sub_type_name' in events.columns else pd.Series(False, index=events.index)
+
+    counts = pd.DataFrame({
+        'player_name': events['player_name'],
+        'shots': is_shot.astype(int),
+        'xg': xg.where(is_shot, 0.0),
+        'npxg': xg.where(is_shot & ~penalty, 0.0),
+        'passes': is_pass.astype(int),
+        'successful_passes': (is_pass & events['outcome_name'].isna()).astype(int),
+        'pressures': (event_type == 'Pressure').astype(int),
+    }).dropna(subset=['player_name']).groupby('player_name').sum()
+
+    stats = player_minutes(events).merge(counts, left_on='player_name', right_index=True, how='left')
+    stats[COUNT_COLUMNS] = stats[COUNT_COLUMNS].fillna(0)
+    return stats
+
+
+def build_profiles(match_stats, min_minutes=270):
+    """Competition per-90 table with ``<stat>_pct`` percentile columns.
+
+    Players under ``min_minutes`` keep their per-90 rates but get no
+    percentiles and do not affect anyone else's.
+    """
+    totals = match_stats.groupby('player_name').agg(
+        matches=('minutes', 'size'),
+        minutes=('minutes', 'sum'),
+        **{col: (col, 'sum') for col in COUNT_COLUMNS}
+    )
+    # A player who moved clubs is listed under the team they played most for
+    team_minutes = match_stats.groupby(['player_name', 'team_name'])['minutes'].sum().reset_index()
+    main_team = team_minutes.sort_values('minutes').drop_duplicates('player_name', keep='last').set_index('player_name')['team_name']
+    totals.insert(0, 'team_name', main_team)
+
+    per_90 = 90 / totals['minutes'].where(totals['minutes'] > 0)
+    for col in ['shots', 'xg', 'npxg', 'passes', 'pressures']:
+        totals[f"{col}_p90"] = totals[col] * per_90
+    totals['pass_accuracy'] = totals['successful_passes'] / totals['passes'].where(totals['passes'] > 0) * 100
+
+    qualified = totals['minutes'] >= min_minutes
+    ranks = totals.loc[qualified, PROFILE_COLUMNS].rank(pct=True) * 100
+    for col in PROFILE_COLUMNS:
+        totals[f"{col}_pct"] = ranks[col].round(1)
+    return totals.reset_index()
+
+
+def match_player_stats(match_id):
+    stats = player_match_stats(shared_store.sbopen_events(match_id))
+    stats.insert(0, 'match_id', match_id)
+    return stats
+
+
+def competition_match_stats(match_ids, workers=None):
+    """Per-player match stats for many matches, one match per worker process"""
+    frames = list(shared_store.map_matches(match_player_stats, match_ids, workers=workers))
+    if not frames:
+        return pd.DataFrame(columns=['match_id', 'player_name', 'team_name', 'minutes'] + COUNT_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def compare_players(profiles, players):
+    """Percentile rows for the given players, in the order given"""
+    table = profiles.set_index('player_name')
+    return table.loc[[player for player in players if player in table.index]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build per-90 player profiles and percentiles for a competition")
+    parser.add_argument('--competition-id', type=int, required=True)
+    parser.add_argument('--season-id', type=int, required=True)
+    parser.add_argument('--min-minutes', type=int, default=270, help="Minutes needed to be ranked")
+    parser.add_argument('--out', default=PLAYER_PROFILES)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    matches = Sbopen().match(competition_id=args.competition_id, season_id=args.season_id)
+    match_stats = competition_match_stats(matches['match_id'].tolist(), workers=args.workers)
+    profiles = build_profiles(match_stats, min_minutes=args.min_minutes)
+    profiles.insert(0, 'competition_id', args.competition_id)
+    profiles.insert(1, 'competition_name', matches['competition_name'].iloc[0])
+    profiles.insert(2, 'season_id', args.season_id)
+    profiles.insert(3, 'season_name', matches['season_name'].iloc[0])
+
+    # Keep profiles built earlier for other competitions
+    if os.path.exists(args.out):
+        previous = pd.read_csv(args.out)
+        same = (previous['competition_id'] == args.competition_id) & (previous['season_id'] == args.season_id)
+        profiles = pd.concat([previous[~same], profiles], ignore_index=True)
+    profiles.to_csv(args.out, index=False)
+    print(f"Wrote {len(profiles)} player rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+"""Possession-chain segmentation and per-team sequence metrics.
+
+Splits a StatsBomb event stream (mplsoccer Sbopen layout) into possession
+chains with shift/cumsum instead of Python loops, then derives per-team style
+features for each match:
+
+- ``sequences``: number of possession chains
+- ``passes_per_sequence``: mean passes per chain
+- ``directness``: forward distance over total ball travel, averaged per chain
+- ``ppda``: opponent passes in their own 60% per defensive action there
+- ``field_tilt``: share of both teams' final-third passes
+- ``sequence_xg``: mean shot xG per chain
+
+Run it over a season to build the extra columns for the Tactical Pattern page:
+
+    python possession_chains.py --competition-id 11 --season-id 1
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+from mplsoccer import Sbopen
+
+import shared_store
+
+SEQUENCE_FEATURES = 'sequence_features.csv'
+FEATURE_COLUMNS = ['sequences', 'passes_per_sequence', 'directness', 'ppda', 'field_tilt', 'sequence_xg']
+
+# Events where the acting team has the ball, used when possession_team_name is missing.
+# Sbopen renames statsbombpy's 'Ball Receipt*' to 'Ball Receipt', so both are listed
+ON_BALL_TYPES = ['Pass', 'Ball Receipt', 'Ball Receipt*', 'Carry', 'Dribble', 'Shot', 'Miscontrol', 'Dispossessed']
+DEFENSIVE_TYPES = ['Interception', 'Duel', 'Foul Committed', 'Block']
+PITCH_LENGTH = 120
+
+
+def segment_chains(events):
+    """Events in match order with ``chain_id`` and ``chain_team`` columns added.
+
+    Chains follow StatsBomb's ``possession`` counter when the frame has it, so
+    back-to-back possessions of the same team (restarts, fouls won, throw-ins)
+    stay separate. Without it, a chain ends when the team in possession
+    changes or a new period starts.
+    """
+    order = [col for col in ('period', 'index') if col in events.columns]
+    df = events.sort_values(order, kind='stable').reset_index(drop=True) if order else events.reset_index(drop=True)
+
+    if 'possession_team_name' in df.columns:
+        owner = df['possession_team_name']
+    else:
+        owner = df['team_name'].where(df['type_name'].isin(ON_BALL_TYPES)).ffill().bfill()
+    period = df['period'] if 'period' in df.columns else pd.Series(1, index=df.index)
+
+    if 'possession' in df.columns:
+        possession = df['possession']
+        new_chain = possession.ne(possession.shift())
+    else:
+        new_chain = owner.ne(owner.shift())
+    new_chain = (new_chain | period.ne(period.shift())).fillna(True).astype(int)
+    df['chain_id'] = new_chain.cumsum() - 1
+    df['chain_team'] = owner
+    return df
+
+
+def chain_metrics(chains):
+    """One row per chain: team, passes, ball travel, xG and duration"""
+    own = chains['team_name'] == chains['chain_team']
+    event_type = chains['type_name']
+    moves = own & event_type.isin(['Pass', 'Carry'])
+
+    dx = (chains['end_x'] - chains['x']).where(moves, 0.0)
+    dy = (chains['end_y'] - chains['y']).where(moves, 0.0)
+    xg = chains['shot_statsbomb_xg'] if 'shot_statsbomb_xg' in chains.columns else pd.Series(0.0, index=chains.index)
+    if {'minute', 'second'} <= set(chains.columns):
+        seconds = chains['minute'] * 60 + chains['second']
+    else:
+        seconds = pd.Series(0, index=chains.index)
+
+    per_event = pd.DataFrame({
+        'chain_id': chains['chain_id'],
+        'team': chains['chain_team'],
+        'passes': (own & (event_type == 'Pass')).astype(int),
+        'forward': dx.fillna(0.0),
+        'distance': np.hypot(dx, dy).fillna(0.0),
+        'xg': xg.where(own & (event_type == 'Shot'), 0.0).fillna(0.0),
+        'seconds': seconds,
+    })
+    per_chain = per_event.groupby('chain_id').agg(
+        team=('team', 'first'),
+        passes=('passes', 'sum'),
+        forward=('forward', 'sum'),
+        distance=('distance', 'sum'),
+        xg=('xg', 'sum'),
+        start=('seconds', 'min'),
+        end=('seconds', 'max'),
+    )
+    per_chain['directness'] = (per_chain['forward'] / per_chain['distance'].where(per_chain['distance'] > 0)).clip(-1, 1)
+    per_chain['duration'] = per_chain['end'] - per_chain['start']
+    return per_chain.dropna(subset=['team'])
+
+
+def team_sequence_features(events):
+    """Per-team sequence metrics for one match, indexed by team name"""
+    per_chain = chain_metrics(segment_chains(events))
+    features = per_chain.groupby('team').agg(
+        sequences=('passes', 'size'),
+        passes_per_sequence=('passes', 'mean'),
+        directness=('directness', 'mean'),
+        sequence_xg=('xg', 'mean'),
+    )
+
+    teams = features.index.tolist()
+    opponent = dict(zip(teams, teams[::-1])) if len(teams) == 2 else {}
+    passes = events[events['type_name'] == 'Pass']
+
+    # PPDA: coordinates are in each acting team's own frame, attacking towards x = 120
+    build_up_passes = passes[passes['x'] < 0.6 * PITCH_LENGTH].groupby('team_name').size()
+    defensive = events[events['type_name'].isin(DEFENSIVE_TYPES) & (events['x'] >= 0.4 * PITCH_LENGTH)]
+    if 'sub_type_name' in defensive.columns:
+        defensive = defensive[(defensive['type_name'] != 'Duel') | (defensive['sub_type_name'] == 'Tackle')]
+    defensive_actions = defensive.groupby('team_name').size()
+    allowed = pd.Series(features.index.map(opponent), index=features.index).map(build_up_passes).astype(float)
+    features['ppda'] = allowed / defensive_actions.reindex(features.index).replace(0, np.nan)
+
+    final_third = passes[passes['x'] >= 2 / 3 * PITCH_LENGTH].groupby('team_name').size().reindex(features.index, fill_value=0)
+    features['field_tilt'] = final_third / final_third.sum() if final_third.sum() > 0 else np.nan
+
+    return features[FEATURE_COLUMNS]
+
+
+def match_sequence_features(match_id):
+    features = team_sequence_features(shared_store.sbopen_events(match_id))
+    features = features.rename_axis('team').reset_index()
+    features.insert(0, 'match_id', match_id)
+    return features
+
+
+def season_sequence_features(match_ids, workers=None):
+    """Sequence features for many matches, one match per worker process"""
+    frames = list(shared_store.map_matches(match_sequence_features, match_ids, workers=workers))
+    if not frames:
+        return pd.DataFrame(columns=['match_id', 'team'] + FEATURE_COLUMNS)
+    return pd.concat(frames, ignore_index=True).sort_values(['match_id', 'team']).reset_index(drop=True)
+
+
+def add_sequence_features(df, features):
+    """Match-level stats with the sequence features joined on match_id and team.
+
+    Metrics a match could not produce (e.g. PPDA without defensive actions)
+    are filled with the column median so the page models get complete rows.
+    """
+    merged = df.merge(features[['match_id', 'team'] + FEATURE_COLUMNS], on=['match_id', 'team'], how='inner')
+    merged[FEATURE_COLUMNS] = merged[FEATURE_COLUMNS].fillna(merged[FEATURE_COLUMNS].median())
+    return merged
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build possession-chain features for a season")
+    parser.add_argument('--competition-id', type=int, required=True)
+    parser.add_argument('--season-id', type=int, required=True)
+    parser.add_argument('--out', default=SEQUENCE_FEATURES)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    matches = Sbopen().match(competition_id=args.competition_id, season_id=args.season_id)
+    features = season_sequence_features(matches['match_id'].tolist(), workers=args.workers)
+
+    # Keep features from earlier runs for other competitions
+    if os.path.exists(args.out):
+        previous = pd.read_csv(args.out)
+        features = pd.concat([previous[~previous['match_id'].isin(features['match_id'])], features], ignore_index=True)
+    features.to_csv(args.out, index=False)
+    print(f"Wrote {len(features)} team-match rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Embedded SQL over the project datasets and locally cached StatsBomb events.
+
+DuckDB queries Parquet copies of the data, so filters and column lists are
+pushed down into the file scans instead of loading whole frames into pandas.
+Three views are available:
+
+- ``formation_results``: merged2_output.csv
+- ``team_match_stats``: match_anlayze.csv
+- ``events``: Sbopen-layout events cached with ``cache_events``, stored as one
+  Parquet file per match under ``events/match_id=<id>/``; filtering on
+  ``match_id`` skips the other matches' files entirely
+
+Results are cached on disk by a hash of the query text and the cached data,
+so repeating a query is a file read until new data arrives. Queries calling
+volatile functions such as ``random()`` or ``now()`` are never cached. Every
+file is written through a temp file and renamed into place, so concurrent
+sessions never read a partial file.
+
+    python query_engine.py cache --competition-id 11 --season-id 1
+    python query_engine.py query "SELECT team_name, SUM(shot_statsbomb_xg) FROM events GROUP BY 1"
+"""
+import argparse
+import glob
+import hashlib
+import os
+import re
+
+import duckdb
+import pandas as pd
+from mplsoccer import Sbopen
+
+import shared_store
+
+CACHE_DIR_ENV = "SMART_TIKI_TAKA_CACHE_DIR"
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATASETS = {
+    'formation_results': 'merged2_output.csv',
+    'team_match_stats': 'match_anlayze.csv',
+}
+
+# Functions whose result changes between runs of the same query
+VOLATILE_FUNCTIONS = re.compile(
+    r"\b(random|setseed|gen_random_uuid|uuid|uuidv4|uuidv7|now|today|current_date|current_time|"
+    r"current_timestamp|get_current_time|get_current_timestamp|transaction_timestamp|localtime|"
+    r"localtimestamp|nextval|currval)\b", re.IGNORECASE)
+
+
+class QueryError(Exception):
+    pass
+
+
+def cache_dir():
+    return os.environ.get(CACHE_DIR_ENV) or os.path.join(BASE_DIR, '.query_cache')
+
+
+def _path(*parts):
+    path = os.path.join(cache_dir(), *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def _write_parquet(df, path):
+    shared_store._atomic_write(path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+
+
+def dataset_parquet(view):
+    """Parquet copy of a CSV dataset, rewritten when the CSV is newer"""
+    csv_path = os.path.join(BASE_DIR, DATASETS[view])
+    path = _path('datasets', f"{view}.parquet")
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(csv_path):
+        _write_parquet(pd.read_csv(csv_path), path)
+    return path
+
+
+def event_files():
+    return sorted(glob.glob(os.path.join(cache_dir(), 'events', 'match_id=*', '*.parquet')))
+
+
+def cached_match_ids():
+    return [int(os.path.basename(os.path.dirname(path)).split('=', 1)[1]) for path in event_files()]
+
+
+def cache_match_events(match_id):
+    """Fetch one match and store it in the event cache; runs in a worker process"""
+    events = shared_store.sbopen_events(match_id)
+    if events.empty:
+        return match_id, 0
+    # match_id comes from the partition directory; a column of the same name would clash
+    events = events.drop(columns=['match_id'], errors='ignore')
+    path = _path('events', f"match_id={match_id}", 'events.parquet')
+    _write_parquet(events, path)
+    return match_id, len(events)
+
+
+def cache_events(match_ids, workers=None, refresh=False):
+    """Add matches to the event cache, skipping ones already cached unless ``refresh``"""
+    cached = set() if refresh else set(cached_match_ids())
+    todo = [match_id for match_id in match_ids if match_id not in cached]
+    return dict(shared_store.map_matches(cache_match_events, todo, workers=workers))
+
+
+def connect():
+    """In-memory DuckDB connection with the project views registered.
+
+    File access is then locked to the dataset and event directories, so a
+    query can read the views but not ``read_text``/``read_csv`` arbitrary
+    paths, and the lock cannot be lifted with ``SET``.
+    """
+    con = duckdb.connect()
+    for view in DATASETS:
+        con.execute(f"CREATE VIEW {view} AS SELECT * FROM read_parquet('{dataset_parquet(view)}')")
+    if event_files():
+        pattern = os.path.join(cache_dir(), 'events', 'match_id=*', '*.parquet')
+        con.execute(f"CREATE VIEW events AS SELECT * FROM read_parquet('{pattern}', "
+                    "hive_partitioning = true, union_by_name = true)")
+    allowed = [os.path.join(cache_dir(), name) + os.sep for name in ('datasets', 'events')]
+    con.execute("SET allowed_directories = ?", [allowed])
+    con.execute("SET enable_external_access = false")
+    con.execute("SET lock_configuration = true")
+    return con
+
+
+def data_version():
+    """Changes whenever a dataset or cached match is added or rewritten"""
+    digest = hashlib.sha1()
+    for path in [os.path.join(BASE_DIR, name) for name in DATASETS.values()] + event_files():
+        digest.update(f"{path}:{os.path.getmtime(path)}".encode())
+    return digest.hexdigest()
+
+
+def check_read_only(sql):
+    try:
+        statements = duckdb.extract_statements(sql)
+    except duckdb.Error as e:
+        raise QueryError(str(e)) from e
+    if len(statements) != 1:
+        raise QueryError("Run exactly one statement at a time")
+    if statements[0].type != duckdb.StatementType.SELECT:
+        raise QueryError("Only SELECT queries are allowed")
+
+
+def query_hash(sql):
+    return hashlib.sha1(f"{data_version()}\n{sql.strip()}".encode()).hexdigest()[:20]
+
+
+def is_volatile(sql):
+    return VOLATILE_FUNCTIONS.search(sql) is not None
+
+
+def query(sql, use_cache=True):
+    """Run a read-only query and return ``(DataFrame, was_cached)``"""
+    check_read_only(sql)
+    use_cache = use_cache and not is_volatile(sql)
+    path = _path('results', f"{query_hash(sql)}.parquet")
+    if use_cache and os.path.exists(path):
+        try:
+            return pd.read_parquet(path), True
+        except (OSError, ValueError):
+            pass  # Unreadable cache file: run the query and rewrite it
+    try:
+        con = connect()
+        try:
+            result = con.execute(sql).df()
+        finally:
+            con.close()
+    except duckdb.Error as e:
+        raise QueryError(str(e)) from e
+    if use_cache:
+        _write_parquet(result, path)
+    return result, False
+
+
+def schema():
+    """Column names and types of every registered view"""
+    con = connect()
+    try:
+        views = con.execute("SELECT view_name FROM duckdb_views() WHERE NOT internal ORDER BY view_name").fetchall()
+        return {view: con.execute(f"DESCRIBE {view}").df()[['column_name', 'column_type']] for (view,) in views}
+    finally:
+        con.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the project data with SQL")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    cache_parser = commands.add_parser('cache', help="Cache StatsBomb events for querying")
+    cache_parser.add_argument('--competition-id', type=int)
+    cache_parser.add_argument('--season-id', type=int)
+    cache_parser.add_argument('--match-ids', type=int, nargs='+')
+    cache_parser.add_argument('--workers', type=int, default=os.cpu_count())
+    cache_parser.add_argument('--refresh', action='store_true', help="Fetch matches that are already cached again")
+
+    query_parser = commands.add_parser('query', help="Run a SELECT query")
+    query_parser.add_argument('sql')
+    query_parser.add_argument('--no-cache', action='store_true')
+    query_parser.add_argument('--out', help="Write the result to this CSV file")
+    args = parser.parse_args()
+
+    if args.command == 'cache':
+        if args.competition_id is not None and args.season_id is not None:
+            match_ids = Sbopen().match(competition_id=args.competition_id, season_id=args.season_id)['match_id'].tolist()
+        elif args.match_ids:
+            match_ids = args.match_ids
+        else:
+            cache_parser.error("pass --competition-id and --season-id, or --match-ids")
+        done = cache_events(match_ids, workers=args.workers, refresh=args.refresh)
+        print(f"Cached {len(done)} matches ({sum(done.values())} events) in {cache_dir()}")
+    else:
+        try:
+            result, cached = query(args.sql, use_cache=not args.no_cache)
+        except QueryError as e:
+            raise SystemExit(f"Query failed: {str(e)}")
+        print(result.to_string(index=False))
+        print(f"\n{len(result)} rows{' (cached)' if cached else ''}")
+        if args.out:
+            result.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""Read-only datasets, match events and fitted models shared between worker processes.
+
+When several Streamlit processes serve the app, set ``SMART_TIKI_TAKA_SHARED_DIR``
+to a directory all of them can see. Datasets and events are then published once
+as Arrow IPC files and memory-mapped read-only by every worker, so the page
+cache lives in the OS page cache instead of in each process. Fitted models are
+written once with joblib and loaded by the other workers instead of being refit.
+
+Run ``python shared_store.py`` before starting the workers to publish the CSV
+datasets up front; anything missing is published lazily by the first worker
+that needs it. Without the environment variable every helper here is unused
+and the pages read the CSV files directly as before.
+"""
+import contextlib
+import hashlib
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from mplsoccer import Sbopen
+
+SHARED_DIR_ENV = "SMART_TIKI_TAKA_SHARED_DIR"
+DATASETS = ('merged2_output.csv', 'match_anlayze.csv')
+
+
+def shared_dir():
+    return os.environ.get(SHARED_DIR_ENV) or None
+
+
+def enabled():
+    return shared_dir() is not None
+
+
+def _path(*parts):
+    path = os.path.join(shared_dir(), *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def _atomic_write(path, write):
+    """Write through a temp file and rename, so readers never see a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def write_frame(df, path):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    def write(tmp_path):
+        with pa.OSFile(tmp_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+    _atomic_write(path, write)
+
+
+def read_table(path):
+    """Memory-map an Arrow IPC file; the returned table references the mapped pages"""
+    with pa.memory_map(path, 'r') as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def read_frame(path):
+    """Arrow-backed DataFrame over a memory-mapped file.
+
+    ``pd.ArrowDtype`` columns keep pointing at the mapped buffers, so reading
+    does not copy strings into Python objects or grow the worker's private
+    memory. List values such as ``location`` come back as ``numpy.ndarray``
+    from ``Series.apply``, ``Series.map`` and ``iterrows`` rather than as
+    lists, so callers must accept arrays.
+    """
+    return read_table(path).to_pandas(types_mapper=pd.ArrowDtype)
+
+
+def publish_csv(csv_path):
+    path = _path('datasets', os.path.splitext(os.path.basename(csv_path))[0] + '.arrow')
+    write_frame(pd.read_csv(csv_path), path)
+    return path
+
+
+def load_csv(csv_path):
+    """CSV dataset from the shared store, publishing it first if missing or stale"""
+    path = _path('datasets', os.path.splitext(os.path.basename(csv_path))[0] + '.arrow')
+    if not os.path.exists(path) or os.path.getmtime(path) < os.path.getmtime(csv_path):
+        publish_csv(csv_path)
+    return read_frame(path)
+
+
+def load_events(source, match_id, fetch):
+    """Events of one match, fetched with ``fetch()`` only by the first worker to ask.
+
+    ``source`` separates the column layouts of different loaders (statsbombpy
+    and mplsoccer's Sbopen). Frames Arrow cannot represent are returned as
+    fetched without being shared.
+    """
+    path = _path('events', source, f"{match_id}.arrow")
+    if os.path.exists(path):
+        return read_frame(path)
+    df = fetch()
+    if df.empty:
+        return df
+    try:
+        write_frame(df, path)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError, pa.ArrowTypeError):
+        return df
+    return read_frame(path)
+
+
+def sbopen_events(match_id):
+    """Sbopen events of one match, through the shared store when it is enabled"""
+    fetch = lambda: Sbopen().event(match_id=match_id)[0]
+    if enabled():
+        return load_events('sbopen', match_id, fetch)
+    return fetch()
+
+
+def map_matches(fn, items, workers=None, args=(), label=None):
+    """Run ``fn(item, *args)`` for every item in worker processes, yielding results as they finish.
+
+    A failing item is reported by ``label(item)`` (the item itself by default)
+    and skipped, so one bad match does not stop a season run.
+    """
+    label = label or (lambda item: item)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(fn, item, *args): item for item in items}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                print(f"{label(futures[future])}: failed ({str(e)})")
+
+
+def fingerprint(*parts):
+    """Short content hash of the frames or arrays a model is fitted on"""
+    digest = hashlib.sha1()
+    for part in parts:
+        if isinstance(part, (pd.DataFrame, pd.Series)):
+            if isinstance(part, pd.DataFrame):
+                digest.update(",".join(map(str, part.columns)).encode())
+            digest.update(pd.util.hash_pandas_object(part, index=False).values.tobytes())
+        else:
+            digest.update(np.ascontiguousarray(part).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def load_or_fit(name, key, fit, stale_after=600, poll=0.5):
+    """Model ``name`` fitted on data with fingerprint ``key``, fitting and publishing it once.
+
+    The first worker to miss the artifact takes an exclusive lock file and
+    fits; the others wait for the artifact instead of fitting their own. A
+    lock older than ``stale_after`` seconds is taken to belong to a worker
+    that died and is broken. Plain numpy arrays inside the artifact are
+    memory-mapped read-only, but scikit-learn estimators copy their tree nodes
+    into private memory when unpickled, so each worker still holds its own
+    copy of a forest.
+    """
+    path = _path('models', f"{name}-{key}.joblib")
+    lock_path = path + '.lock'
+    while not os.path.exists(path):
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock_path) > stale_after:
+                    os.remove(lock_path)
+            except FileNotFoundError:
+                pass
+            time.sleep(poll)
+            continue
+        os.close(fd)
+        try:
+            if os.path.exists(path):
+                break
+            model = fit()
+            if model is not None:
+                _atomic_write(path, lambda tmp_path: joblib.dump(model, tmp_path))
+            return model
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(lock_path)
+    return joblib.load(path, mmap_mode='r')
+
+
+if __name__ == "__main__":
+    if not enabled():
+        raise SystemExit(f"Set {SHARED_DIR_ENV} to the shared directory first")
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in DATASETS:
+        print(f"Published {publish_csv(os.path.join(base_dir, name))}")
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from formation_matchups import MatchupTable, build_matchup_table
+
+
+def result(winner, loser, winner_goals, loser_goals, winner_xg=None, loser_xg=None):
+    return {
+        'Winning Team Formation': winner, 'Losing Team Formation': loser,
+        'Winning Team Goals': winner_goals, 'Losing Team Goals': loser_goals,
+        'Winning Team xG': winner_xg, 'Losing Team xG': loser_xg,
+    }
+
+
+def test_matches_are_recorded_from_both_sides():
+    table = MatchupTable(prior_strength=0)
+    assert table.update(result('4-3-3', ' 4-4-2 ', '2', '1 (4)', 1.5, 0.5))
+    assert len(table) == 1
+    assert table.formations() == ['4-3-3', '4-4-2']
+
+    win = table.lookup('4-3-3', '4-4-2')
+    loss = table.lookup('4-4-2', '4-3-3')
+    assert (win['Matches'], win['Win Rate'], win['Mean xG Diff']) == (1, 1.0, 1.0)
+    assert (loss['Matches'], loss['Loss Rate'], loss['Mean xG Diff']) == (1, 1.0, -1.0)
+
+
+def test_unusable_rows_are_skipped():
+    table = MatchupTable()
+    assert not table.update(result('4-3-3', np.nan, '2', '1'))
+    assert not table.update(result('4-3-3', '4-4-2', 'abandoned', '1'))
+    assert len(table) == 0
+
+
+def test_thin_matchups_shrink_towards_the_prior():
+    table = MatchupTable(prior_strength=5)
+    # Three matches recorded from both sides: 2 wins, 2 draws and 2 losses
+    table.update(result('4-3-3', '4-4-2', 1, 0, 1.2, 0.2))
+    table.update(result('3-5-2', '5-3-2', 1, 1))
+    table.update(result('4-2-3-1', '3-4-3', 3, 0))
+    assert table.prior() == pytest.approx((1 / 3, 1 / 3, 1 / 3))
+
+    row = table.lookup('4-3-3', '4-4-2')
+    assert row['Win Rate'] == pytest.approx((1 + 5 / 3) / 6)
+    assert row['Loss Rate'] == pytest.approx((5 / 3) / 6)
+    assert row['Mean xG Diff'] == pytest.approx(1.0 / 6)
+
+    unseen = table.lookup('4-3-3', '3-4-3')
+    assert unseen['Matches'] == 0
+    assert unseen['Win Rate'] == pytest.approx(1 / 3)
+
+
+def test_counters_are_ordered_by_expected_points():
+    df = pd.DataFrame([
+        result('4-3-3', '4-4-2', 2, 0),
+        result('4-3-3', '4-4-2', 1, 0),
+        result('3-5-2', '4-4-2', 1, 0),
+        result('4-2-3-1', '4-4-2', 1, 1),
+        result('4-2-3-1', '4-4-2', 2, 2),
+    ])
+    table = build_matchup_table(df)
+
+    counters = table.counters('4-4-2')
+    assert counters['Formation'].tolist() == ['4-3-3', '3-5-2', '4-2-3-1']
+    assert counters['Expected Points'].is_monotonic_decreasing
+    assert table.counters('4-4-2', min_matches=2)['Formation'].tolist() == ['4-3-3', '4-2-3-1']
+    assert table.counters('4-4-2', min_matches=3).empty
@@ -0,0 +1,39 @@
+import pandas as pd
+
+import player_profiles
+
+
+def match_events():
+    rows = [
+        # minute, type_name, player_name, team_name, substitution_replacement_name, foul_committed_card_name
+        (0, 'Pass', 'Alba', 'Home', None, None),
+        (0, 'Pass', 'Busquets', 'Home', None, None),
+        (1, 'Pass', 'Casemiro', 'Away', None, None),
+        (2, 'Pass', 'Dani', 'Away', None, None),
+        (30, 'Player Off', 'Alba', 'Home', None, None),
+        (32, 'Player On', 'Alba', 'Home', None, None),
+        (50, 'Player Off', 'Dani', 'Away', None, None),
+        (60, 'Substitution', 'Alba', 'Home', 'Sergi', None),
+        (70, 'Foul Committed', 'Casemiro', 'Away', None, 'Red Card'),
+        (90, 'Pass', 'Busquets', 'Home', None, None),
+    ]
+    events = pd.DataFrame(rows, columns=['minute', 'type_name', 'player_name', 'team_name',
+                                         'substitution_replacement_name', 'foul_committed_card_name'])
+    events['second'] = 0
+    return events
+
+
+def test_player_minutes():
+    minutes = player_profiles.player_minutes(match_events()).set_index('player_name')['minutes']
+    assert minutes.to_dict() == {
+        'Alba': 58,       # off for treatment 30-32, then substituted at 60
+        'Busquets': 90,
+        'Casemiro': 70,   # sent off
+        'Dani': 50,       # Player Off with no Player On
+        'Sergi': 30,      # came on at 60
+    }
+
+
+def test_substitute_takes_the_team_of_the_substitution():
+    teams = player_profiles.player_minutes(match_events()).set_index('player_name')['team_name']
+    assert teams['Sergi'] == 'Home'
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import possession_chains
+
+
+def events_frame(rows, columns):
+    events = pd.DataFrame(rows, columns=columns)
+    events['index'] = range(1, len(events) + 1)
+    return events
+
+
+def test_chains_follow_possession_counter():
+    events = events_frame([
+        (1, 1, 'A', 'A', 'Pass'),
+        (1, 1, 'A', 'A', 'Ball Receipt'),
+        (1, 2, 'A', 'A', 'Pass'),   # free kick won: same team, new possession
+        (1, 3, 'B', 'B', 'Pass'),
+        (2, 3, 'B', 'B', 'Pass'),   # a new period always starts a new chain
+    ], ['period', 'possession', 'possession_team_name', 'team_name', 'type_name'])
+    chains = possession_chains.segment_chains(events)
+    assert chains['chain_id'].tolist() == [0, 0, 1, 2, 3]
+    assert chains['chain_team'].tolist() == ['A', 'A', 'A', 'B', 'B']
+
+
+def test_chains_fall_back_to_on_ball_events():
+    events = events_frame([
+        (1, 'B', 'Pressure'),
+        (1, 'A', 'Pass'),
+        (1, 'A', 'Ball Receipt'),
+        (1, 'B', 'Pressure'),
+        (1, 'A', 'Pass'),
+        (1, 'B', 'Ball Receipt'),
+        (1, 'B', 'Carry'),
+    ], ['period', 'team_name', 'type_name'])
+    chains = possession_chains.segment_chains(events)
+    assert chains['chain_team'].tolist() == ['A', 'A', 'A', 'A', 'A', 'B', 'B']
+    assert chains['chain_id'].tolist() == [0, 0, 0, 0, 0, 1, 1]
+
+
+def test_ppda_and_field_tilt():
+    rows = [('A', 'Pass', x, None) for x in (10, 50, 90)]
+    rows += [('B', 'Pass', x, None) for x in (20, 30, 60, 85, 100)]
+    rows += [
+        ('A', 'Interception', 60, None),
+        ('A', 'Duel', 70, 'Tackle'),
+        ('A', 'Duel', 70, 'Aerial Lost'),   # only tackles count as duels
+        ('A', 'Block', 30, None),           # outside the pressing zone
+        ('B', 'Foul Committed', 50, None),
+    ]
+    events = events_frame(rows, ['team_name', 'type_name', 'x', 'sub_type_name'])
+    events['period'] = 1
+    events['y'] = 40.0
+    events['end_x'] = np.where(events['type_name'] == 'Pass', events['x'] + 5, np.nan)
+    events['end_y'] = 40.0
+
+    features = possession_chains.team_sequence_features(events)
+    # A allowed B three build-up passes for two defensive actions, B allowed A two for one
+    assert features.loc['A', 'ppda'] == pytest.approx(1.5)
+    assert features.loc['B', 'ppda'] == pytest.approx(2.0)
+    assert features.loc['A', 'field_tilt'] == pytest.approx(1 / 3)
+    assert features.loc['B', 'field_tilt'] == pytest.approx(2 / 3)
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+import query_engine
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv(query_engine.CACHE_DIR_ENV, str(tmp_path / 'cache'))
+    path = query_engine._path('events', 'match_id=1', 'events.parquet')
+    pd.DataFrame({'type_name': ['Pass', 'Shot'], 'team_name': ['A', 'B']}).to_parquet(path, index=False)
+    outside = tmp_path / 'outside'
+    outside.mkdir()
+    pd.DataFrame({'secret': [1]}).to_parquet(outside / 'secret.parquet', index=False)
+    (outside / 'secret.csv').write_text("secret\n1\n")
+    return outside
+
+
+def test_views_are_queryable(cache):
+    result, cached = query_engine.query("SELECT match_id, COUNT(*) AS n FROM events GROUP BY 1", use_cache=False)
+    assert result.to_dict('records') == [{'match_id': 1, 'n': 2}]
+    assert not query_engine.query("SELECT * FROM formation_results LIMIT 1", use_cache=False)[0].empty
+
+
+@pytest.mark.parametrize('sql', [
+    "SELECT content FROM read_text('/etc/passwd')",
+    "SELECT * FROM read_csv('{outside}/secret.csv')",
+    "SELECT * FROM read_parquet('{outside}/secret.parquet')",
+    "SELECT * FROM '{outside}/secret.parquet'",
+])
+def test_arbitrary_files_are_rejected(cache, sql):
+    with pytest.raises(query_engine.QueryError):
+        query_engine.query(sql.format(outside=cache), use_cache=False)
+
+
+def test_lockdown_cannot_be_lifted(cache):
+    con = query_engine.connect()
+    try:
+        with pytest.raises(Exception):
+            con.execute("SET enable_external_access = true")
+    finally:
+        con.close()
+
+
+def test_results_are_cached(cache):
+    sql = "SELECT COUNT(*) AS n FROM events"
+    assert query_engine.query(sql)[1] is False
+    assert query_engine.query(sql)[1] is True
+
+
+def test_volatile_queries_are_not_cached(cache):
+    first, cached = query_engine.query("SELECT random() AS r")
+    second, cached_again = query_engine.query("SELECT random() AS r")
+    assert not cached and not cached_again
+    assert first['r'][0] != second['r'][0]
+
+
+def test_unreadable_cache_file_is_a_miss(cache):
+    sql = "SELECT COUNT(*) AS n FROM events"
+    query_engine.query(sql)
+    with open(query_engine._path('results', f"{query_engine.query_hash(sql)}.parquet"), 'wb') as f:
+        f.write(b"PAR1 truncated")
+    result, cached = query_engine.query(sql)
+    assert not cached and result['n'][0] == 2
+    assert query_engine.query(sql)[1] is True
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import xg_model
+
+
+def test_angle_subtended_by_goal_mouth():
+    distance, angle = xg_model.distance_and_angle(108, 40)
+    assert distance == pytest.approx(12)
+    assert angle == pytest.approx(2 * np.arctan(4 / 12))
+
+
+def test_assists_from_sbopen_layout():
+    events = pd.DataFrame({
+        'id': ['p1', 'p2', 'p3', 's1', 's2', 's3', 's4'],
+        'type_name': ['Pass', 'Pass', 'Pass', 'Shot', 'Shot', 'Shot', 'Shot'],
+        'pass_height_name': ['Ground Pass', 'High Pass', 'Ground Pass', None, None, None, None],
+        'pass_cross': [None, True, None, None, None, None, None],
+        'pass_cut_back': [None, None, True, None, None, None, None],
+        'technique_name': [None, None, None, None, None, None, None],
+        'shot_key_pass_id': [None, None, None, 'p1', 'p2', 'p3', None],
+    })
+    assert xg_model.assist_types(events).tolist() == ['Ground Pass', 'Cross', 'Cut Back', 'None']
+
+
+def test_assists_from_statsbombpy_layout():
+    events = pd.DataFrame({
+        'id': ['p1', 'p2', 's1', 's2'],
+        'type': ['Pass', 'Pass', 'Shot', 'Shot'],
+        'pass_height': ['High Pass', 'Ground Pass', None, None],
+        'pass_technique': [None, 'Through Ball', None, None],
+        'shot_key_pass_id': [None, None, 'p1', 'p2'],
+    })
+    assert xg_model.assist_types(events).tolist() == ['High Pass', 'Through Ball']
+
+
+def test_predict_matches_predict_one():
+    rng = np.random.default_rng(0)
+    n = 400
+    shots = pd.DataFrame({
+        'x': rng.uniform(90, 119, n),
+        'y': rng.uniform(20, 60, n),
+        'body_part_name': rng.choice(['Right Foot', 'Left Foot', 'Head'], n),
+        'sub_type_name': rng.choice(['Open Play', 'Free Kick'], n),
+        'assist_type': rng.choice(['None', 'Cross', 'Through Ball'], n),
+    })
+    features = xg_model.shot_features(shots)
+    goals = pd.Series((rng.uniform(size=n) < 1 / (1 + features['distance'] / 4)).astype(int))
+    model = xg_model.train(features, goals)
+
+    batched = model.predict(shots, batch_size=64)
+    single = [model.predict_one(row.x, row.y, row.body_part_name, row.sub_type_name, row.assist_type)
+              for row in shots.itertuples()]
+    np.testing.assert_allclose(batched.to_numpy(), single)
@@ -0,0 +1,279 @@
+"""Locally trained expected-goals model.
+
+A logistic regression on shot distance, shot angle, body part, shot type and
+assist type, trained on the shots in the query engine's event cache. After
+fitting, only the coefficients are kept, so scoring is plain NumPy: a batch of
+millions of shots is a handful of vector operations, and ``predict_one``
+answers "what if the shot came from here" with a few dictionary lookups.
+
+Works with both the mplsoccer Sbopen and statsbombpy event layouts.
+
+    python xg_model.py train
+    python xg_model.py score shots.parquet scored.parquet
+    python xg_model.py what-if 105 30 --body-part "Left Foot"
+"""
+import argparse
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import brier_score_loss, log_loss
+from sklearn.model_selection import train_test_split
+
+XG_MODEL = 'xg_model.joblib'
+XG_MODEL_ENV = "SMART_TIKI_TAKA_XG_MODEL"
+NUMERIC_FEATURES = ['distance', 'angle']
+CATEGORY_FEATURES = ['body_part', 'shot_type', 'assist_type']
+
+# StatsBomb pitch: 120 x 80, goal centred on (120, 40) with posts 8 units apart
+GOAL_X, GOAL_Y, GOAL_WIDTH = 120.0, 40.0, 8.0
+
+
+def model_path():
+    return os.environ.get(XG_MODEL_ENV) or os.path.join(os.path.dirname(os.path.abspath(__file__)), XG_MODEL)
+
+
+def model_version(path=None):
+    """Modification time of the saved model, or None when none has been trained"""
+    try:
+        return os.path.getmtime(path or model_path())
+    except OSError:
+        return None
+
+
+def distance_and_angle(x, y):
+    """Distance to the goal centre and the angle the goal mouth subtends, vectorized"""
+    dx = GOAL_X - np.asarray(x, dtype=float)
+    dy = np.asarray(y, dtype=float) - GOAL_Y
+    distance = np.hypot(dx, dy)
+    angle = np.arctan2(GOAL_WIDTH * dx, dx ** 2 + dy ** 2 - (GOAL_WIDTH / 2) ** 2)
+    return distance, np.where(angle < 0, angle + np.pi, angle)
+
+
+def _first_column(df, *names):
+    return next((name for name in names if name in df.columns), None)
+
+
+def shot_coordinates(shots):
+    """x and y arrays from flat x/y columns or statsbombpy location lists"""
+    if 'x' in shots.columns and 'y' in shots.columns:
+        return shots['x'].to_numpy(dtype=float), shots['y'].to_numpy(dtype=float)
+    loc = shots['location'].map(lambda value: value if isinstance(value, (list, tuple, np.ndarray)) and len(value) >= 2 else (np.nan, np.nan))
+    return np.array([value[0] for value in loc], dtype=float), np.array([value[1] for value in loc], dtype=float)
+
+
+def assist_types(events):
+    """Assist category for every shot in an event frame, from its key pass"""
+    type_col = _first_column(events, 'type_name', 'type')
+    shots = events[events[type_col] == 'Shot']
+    assist = pd.Series('None', index=shots.index)
+    if 'shot_key_pass_id' not in events.columns:
+        return assist
+
+    key = shots['shot_key_pass_id']
+    passes = events[events[type_col] == 'Pass'].drop_duplicates('id').set_index('id')
+
+    def key_pass(*names):
+        name = _first_column(passes, *names)
+        return key.map(passes[name]) if name else pd.Series(np.nan, index=shots.index)
+
+    assist[key.notna()] = 'Ground Pass'
+    assist[key_pass('pass_height_name', 'pass_height') == 'High Pass'] = 'High Pass'
+    assist[key_pass('pass_cross').eq(True)] = 'Cross'
+    assist[key_pass('pass_cut_back').eq(True)] = 'Cut Back'
+    assist[key_pass('technique_name', 'pass_technique') == 'Through Ball'] = 'Through Ball'
+    return assist
+
+
+def shot_assists(shots, events=None):
+    """Assist type per shot: an ``assist_type`` column, else derived from ``events``"""
+    if 'assist_type' in shots.columns:
+        return shots['assist_type']
+    if events is not None:
+        return assist_types(events).reindex(shots.index)
+    return pd.Series('None', index=shots.index)
+
+
+def shot_features(shots, events=None, assist=None):
+    """Model inputs for a frame of shots; pass ``assist`` to reuse assist types already derived"""
+    x, y = shot_coordinates(shots)
+    distance, angle = distance_and_angle(x, y)
+    body_col = _first_column(shots, 'body_part_name', 'shot_body_part', 'body_part')
+    type_col = _first_column(shots, 'sub_type_name', 'shot_type')
+    if assist is None:
+        assist = shot_assists(shots, events)
+    return pd.DataFrame({
+        'distance': distance,
+        'angle': angle,
+        'body_part': shots[body_col].fillna('Unknown').to_numpy() if body_col else 'Unknown',
+        'shot_type': shots[type_col].fillna('Open Play').to_numpy() if type_col else 'Open Play',
+        'assist_type': assist.fillna('None').to_numpy(),
+    }, index=shots.index)
+
+
+class XGModel:
+    """Logistic xG model reduced to its coefficients"""
+
+    def __init__(self, intercept, numeric_weights, category_weights, meta=None):
+        self.intercept = float(intercept)
+        self.numeric_weights = dict(numeric_weights)
+        self.category_weights = {feature: dict(weights) for feature, weights in category_weights.items()}
+        self.meta = meta or {}
+
+    def _logit(self, features):
+        logit = np.full(len(features), self.intercept)
+        for feature in NUMERIC_FEATURES:
+            logit += self.numeric_weights[feature] * features[feature].to_numpy(dtype=float)
+        for feature in CATEGORY_FEATURES:
+            # Unseen categories fall back to the baseline, like an ignored one-hot column
+            logit += features[feature].map(self.category_weights[feature]).fillna(0.0).to_numpy(dtype=float)
+        return logit
+
+    def predict_features(self, features):
+        return 1 / (1 + np.exp(-self._logit(features)))
+
+    def predict(self, shots, events=None, batch_size=1_000_000):
+        """xG for every shot, scored in batches of ``batch_size`` rows"""
+        assist = shot_assists(shots, events)
+        scores = np.empty(len(shots))
+        for start in range(0, len(shots), batch_size):
+            batch = slice(start, start + batch_size)
+            scores[batch] = self.predict_features(shot_features(shots.iloc[batch], assist=assist.iloc[batch]))
+        return pd.Series(scores, index=shots.index)
+
+    def predict_one(self, x, y, body_part='Right Foot', shot_type='Open Play', assist_type='None'):
+        """xG of a single hypothetical shot from (x, y)"""
+        distance, angle = distance_and_angle(x, y)
+        logit = (self.intercept
+                 + self.numeric_weights['distance'] * float(distance)
+                 + self.numeric_weights['angle'] * float(angle)
+                 + self.category_weights['body_part'].get(body_part, 0.0)
+                 + self.category_weights['shot_type'].get(shot_type, 0.0)
+                 + self.category_weights['assist_type'].get(assist_type, 0.0))
+        return 1 / (1 + np.exp(-logit))
+
+    def categories(self, feature):
+        return sorted(self.category_weights[feature])
+
+    def save(self, path=None):
+        # Plain coefficients rather than a pickled class, so the artifact loads from any entry point
+        joblib.dump({
+            'intercept': self.intercept,
+            'numeric_weights': self.numeric_weights,
+            'category_weights': self.category_weights,
+            'meta': self.meta,
+        }, path or model_path())
+
+    @staticmethod
+    def load(path=None):
+        return XGModel(**joblib.load(path or model_path()))
+
+
+def train(features, goals, random_state=33):
+    """Fit on shot features and goal labels; hold-out scores are kept in ``meta``"""
+    X = pd.get_dummies(features, columns=CATEGORY_FEATURES, prefix_sep='=', dtype=float)
+    X_train, X_test, y_train, y_test = train_test_split(X, goals, test_size=0.2, random_state=random_state, stratify=goals)
+    holdout = LogisticRegression(max_iter=1000).fit(X_train, y_train)
+    predicted = holdout.predict_proba(X_test)[:, 1]
+    meta = {
+        'shots': int(len(features)),
+        'goals': int(goals.sum()),
+        'holdout_log_loss': float(log_loss(y_test, predicted)),
+        'holdout_brier': float(brier_score_loss(y_test, predicted)),
+    }
+
+    model = LogisticRegression(max_iter=1000).fit(X, goals)
+    weights = dict(zip(X.columns, model.coef_[0]))
+    category_weights = {feature: {} for feature in CATEGORY_FEATURES}
+    for column, weight in weights.items():
+        if '=' in column:
+            feature, category = column.split('=', 1)
+            category_weights[feature][category] = float(weight)
+    return XGModel(model.intercept_[0], {feature: weights[feature] for feature in NUMERIC_FEATURES}, category_weights, meta)
+
+
+def score_events(events, model):
+    """Model xG for the shots in an event frame, indexed like those shots"""
+    type_col = _first_column(events, 'type_name', 'type')
+    shots = events[events[type_col] == 'Shot']
+    if shots.empty:
+        return pd.Series(dtype=float)
+    return model.predict(shots, events)
+
+
+def fill_missing_xg(events, model, xg_col='shot_statsbomb_xg', scores=None):
+    """Copy of ``events`` whose shots without a provider xG are scored by ``model``.
+
+    Pass ``scores`` from ``score_events`` to reuse them instead of scoring again.
+    """
+    if scores is None:
+        scores = score_events(events, model)
+    events = events.copy()
+    if xg_col not in events.columns:
+        events[xg_col] = np.nan
+    missing = events.index.isin(scores.index) & events[xg_col].isna().to_numpy()
+    events.loc[missing, xg_col] = scores.reindex(events.index[missing]).to_numpy()
+    return events
+
+
+def load_training_shots():
+    """Shot features and goal labels from the query engine's event cache"""
+    import query_engine
+
+    con = query_engine.connect()
+    try:
+        if 'events' not in {row[0] for row in con.execute("SELECT view_name FROM duckdb_views()").fetchall()}:
+            raise ValueError("No cached events; run `python query_engine.py cache ...` first")
+        available = set(con.execute("DESCRIBE events").df()['column_name'])
+        wanted = ['match_id', 'id', 'type_name', 'x', 'y', 'outcome_name', 'body_part_name', 'sub_type_name',
+                  'shot_key_pass_id', 'pass_height_name', 'pass_cross', 'pass_cut_back', 'technique_name']
+        columns = ', '.join(f'"{col}"' for col in wanted if col in available)
+        key_pass_filter = ("OR id IN (SELECT shot_key_pass_id FROM events WHERE type_name = 'Shot')"
+                           if 'shot_key_pass_id' in available else "")
+        events = con.execute(f"SELECT {columns} FROM events WHERE type_name = 'Shot' {key_pass_filter}").df()
+    finally:
+        con.close()
+
+    shots = events[(events['type_name'] == 'Shot') & events['x'].notna()]
+    return shot_features(shots, events), (shots['outcome_name'] == 'Goal').astype(int)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train and use the local xG model")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('train', help="Fit on the cached events and save the model")
+
+    score_parser = commands.add_parser('score', help="Add an xg column to a CSV or Parquet file of shots")
+    score_parser.add_argument('input')
+    score_parser.add_argument('output')
+
+    what_if_parser = commands.add_parser('what-if', help="xG of a single shot from (x, y)")
+    what_if_parser.add_argument('x', type=float)
+    what_if_parser.add_argument('y', type=float)
+    what_if_parser.add_argument('--body-part', default='Right Foot')
+    what_if_parser.add_argument('--shot-type', default='Open Play')
+    what_if_parser.add_argument('--assist-type', default='None')
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        features, goals = load_training_shots()
+        model = train(features, goals)
+        model.save()
+        print(f"Trained on {model.meta['shots']} shots ({model.meta['goals']} goals), "
+              f"hold-out log loss {model.meta['holdout_log_loss']:.4f}, "
+              f"Brier {model.meta['holdout_brier']:.4f}; saved to {model_path()}")
+    elif args.command == 'score':
+        read = pd.read_parquet if args.input.endswith('.parquet') else pd.read_csv
+        shots = read(args.input)
+        shots['xg'] = XGModel.load().predict(shots)
+        shots.to_parquet(args.output, index=False) if args.output.endswith('.parquet') else shots.to_csv(args.output, index=False)
+        print(f"Scored {len(shots)} shots into {args.output}")
+    else:
+        xg = XGModel.load().predict_one(args.x, args.y, args.body_part, args.shot_type, args.assist_type)
+        print(f"xG: {xg:.3f}")
+
+
+if __name__ == "__main__":
+    main()